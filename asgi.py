@@ -0,0 +1,181 @@
+"""Async serving mode for the public read endpoints.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5051
+
+Product, certificate and language GETs are answered by coroutines on an async driver
+(asyncpg / aiosqlite) and pool, so one process can hold thousands of slow clients.
+Every other path is handed to the Flask app through a2wsgi.
+"""
+import asyncio
+import contextlib
+from sqlalchemy import select
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from a2wsgi import WSGIMiddleware
+
+from app import app as flask_app
+from models.product import Product
+from models.language import Language
+from models.certificate import Certificate
+from models.table_counter import TableCounter
+from models.product_translation import ProductTranslation
+from models.certificate_translation import CertificateTranslation
+from utils.utils import get_response
+from utils.async_db import AsyncDatabase
+from utils.counters import COUNT_MODES
+from utils.pricing import rate_cache, apply_prices
+from utils.translations import translation_catalog
+from utils.localization import negotiate_lang, localized_select, localize
+from utils.read_model import product_sort
+from utils.invalidation import start_listener
+
+config = flask_app.config
+database = AsyncDatabase(config)
+catalog_lock = asyncio.Lock()
+rates_lock = asyncio.Lock()
+
+def json_response(body, status_code, lang=None):
+    response = Response(flask_app.json.dumps(body), status_code=status_code, media_type="application/json")
+    if lang is not None:
+        response.headers["Content-Language"] = lang
+        response.headers["Vary"] = "Accept-Language"
+    return response
+
+def request_lang(request):
+    supported = config.get("SUPPORTED_LANGUAGES", ["uz"])
+    default = config.get("DEFAULT_LANGUAGE", supported[0])
+    return negotiate_lang(request.query_params.get("lang"), request.headers.get("accept-language"), supported, default)
+
+async def current_rates(session):
+    rates = rate_cache.fresh(config.get("GOLD_RATE_CACHE_TTL", 300))
+    if rates is not None:
+        return rates
+
+    async with rates_lock:
+        rates = rate_cache.fresh(config.get("GOLD_RATE_CACHE_TTL", 300))
+        if rates is None:
+            rates = rate_cache.store((await session.scalars(rate_cache.statement())).all())
+        return rates
+
+async def catalog(session):
+    # Returns the entries themselves: a lookup on the shared catalog could reload it
+    # through the synchronous session.
+    ttl = config.get("TRANSLATION_CATALOG_TTL", 300)
+    entries = translation_catalog.fresh(ttl)
+    if entries is None:
+        async with catalog_lock:
+            entries = translation_catalog.fresh(ttl)
+            if entries is None:
+                generation = translation_catalog.begin()
+                entries = translation_catalog.fill((await session.scalars(select(Language).order_by(Language.id))).all(), generation)
+    return entries
+
+async def table_count(session, name, mode, matched=None):
+    # Counter rows only: reconciliation stays with the threaded app and the CLI.
+    if mode not in COUNT_MODES:
+        return None
+    # A filtered list is returned whole, so its length is the count.
+    if matched is not None:
+        return matched
+    return await session.scalar(select(TableCounter.count).where(TableCounter.name == name))
+
+async def product_get(request):
+    lang = request_lang(request)
+    statement = localized_select(Product, ProductTranslation, ProductTranslation.product_id, lang, config.get("DEFAULT_LANGUAGE", "uz"))
+    async with database.session() as session:
+        row = (await session.execute(statement.where(Product.id == request.path_params["product_id"]))).first()
+        if not row:
+            return json_response(get_response("Product not found", None, 404), 404, lang)
+
+        product, title, description = row
+        image_size = request.query_params.get("image_size")
+        rates = await current_rates(session)
+    result_product = apply_prices([localize(Product.to_dict(product, image_size), title, description)], rates)[0]
+    return json_response(get_response("Product successfully found", result_product, 200), 200, lang)
+
+async def product_list(request):
+    lang = request_lang(request)
+    statement = localized_select(Product, ProductTranslation, ProductTranslation.product_id, lang, config.get("DEFAULT_LANGUAGE", "uz"))
+    image_size = request.query_params.get("image_size")
+    filtered = False
+    product_type = request.query_params.get("type")
+    if product_type is not None:
+        statement = statement.where(Product.type == product_type)
+        filtered = True
+    proba = request.query_params.get("proba")
+    if proba is not None and proba.lstrip("-").isdigit():
+        statement = statement.where(Product.proba == int(proba))
+        filtered = True
+    sort, descending = product_sort(request.query_params.get("sort"))
+    order = (getattr(Product, sort).desc(), Product.id.desc()) if descending else (getattr(Product, sort), Product.id)
+    async with database.session() as session:
+        product_list = (await session.execute(statement.order_by(*order))).all()
+        rates = await current_rates(session)
+        count = await table_count(session, "product", request.query_params.get("count"), len(product_list) if filtered else None)
+    result_product_list = apply_prices([
+        localize(Product.to_dict(product, image_size), title, description)
+        for product, title, description in product_list
+    ], rates)
+    return json_response(get_response("Product List", result_product_list, 200, count), 200, lang)
+
+async def certificate_get(request):
+    lang = request_lang(request)
+    statement = localized_select(Certificate, CertificateTranslation, CertificateTranslation.certificate_id, lang, config.get("DEFAULT_LANGUAGE", "uz"))
+    async with database.session() as session:
+        row = (await session.execute(statement.where(Certificate.id == request.path_params["certificate_id"]))).first()
+    if not row:
+        return json_response(get_response("Certificate not found", None, 404), 404, lang)
+
+    certificate, title, description = row
+    result_certificate = localize(Certificate.to_dict(certificate), title, description)
+    return json_response(get_response("Certificate successfully found", result_certificate, 200), 200, lang)
+
+async def certificate_list(request):
+    lang = request_lang(request)
+    statement = localized_select(Certificate, CertificateTranslation, CertificateTranslation.certificate_id, lang, config.get("DEFAULT_LANGUAGE", "uz"))
+    async with database.session() as session:
+        certificate_list = (await session.execute(statement.order_by(Certificate.created_at.desc()))).all()
+        count = await table_count(session, "certificate", request.query_params.get("count"))
+    result_certificate_list = [
+        localize(Certificate.to_dict(certificate), title, description)
+        for certificate, title, description in certificate_list
+    ]
+    return json_response(get_response("Certificate List", result_certificate_list, 200, count), 200, lang)
+
+async def language_get(request):
+    async with database.session() as session:
+        language = translation_catalog.get(request.path_params["lang"], request.path_params["code"], await catalog(session))
+    if not language:
+        return json_response(get_response("Language not found", None, 404), 404)
+
+    return json_response(get_response("Language successfully found", language, 200), 200)
+
+async def language_bundle(request):
+    async with database.session() as session:
+        result_bundle = translation_catalog.bundle(request.path_params["lang"], await catalog(session))
+    return json_response(get_response("Language Bundle", result_bundle, 200), 200)
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    start_listener()
+    yield
+    await database.dispose()
+
+routes = [
+    Route("/api/product/", product_list, methods=["GET"]),
+    Route("/api/product/{product_id:int}", product_get, methods=["GET"]),
+    Route("/api/certificate/", certificate_list, methods=["GET"]),
+    Route("/api/certificate/{certificate_id:int}", certificate_get, methods=["GET"]),
+    Route("/api/language/user/{lang}/{code}", language_get, methods=["GET"]),
+    Route("/api/language/bundle/{lang}", language_bundle, methods=["GET"]),
+    Mount("/", WSGIMiddleware(flask_app))
+]
+
+middleware = []
+if config.get("COMPRESSION_ENABLED", True):
+    middleware.append(Middleware(GZipMiddleware, minimum_size=config.get("COMPRESSION_MIN_SIZE", 1024)))
+
+app = Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
@@ -0,0 +1,85 @@
+"""Bytes-on-wire and CPU cost of response compression.
+
+For product lists of several sizes it reports raw, gzip and brotli sizes with the
+compression time of each, then times the list endpoint through the test client
+with the response cache off (compress per request) and on (compress once).
+
+    python benchmarks/bench_compression.py --sizes 10 100 1000 10000
+"""
+import time
+import argparse
+
+from common import load_app, seed, summarize, save_results
+
+def compression_costs(app, body, repeat):
+    from utils.compression import available_encodings, compress
+
+    costs = {"raw": {"bytes": len(body)}}
+    with app.app_context():
+        for encoding in available_encodings():
+            start = time.perf_counter()
+            for _ in range(repeat):
+                data = compress(body, encoding)
+            elapsed = (time.perf_counter() - start) / repeat
+            costs[encoding] = {
+                "bytes": len(data),
+                "ratio": round(len(data) / len(body), 4),
+                "compress_ms": round(elapsed * 1000, 3)
+            }
+    return costs
+
+def request_costs(app, encoding, requests):
+    from utils.cache import response_cache
+
+    client = app.test_client()
+    headers = {"Accept-Encoding": encoding}
+    results = {}
+    for cache_enabled in (False, True):
+        response_cache.invalidate()
+        latencies = []
+        wall_start = time.perf_counter()
+        for _ in range(requests):
+            start = time.perf_counter()
+            if cache_enabled:
+                client.get("/api/product/", headers=headers)
+            else:
+                # A changing query string defeats the cache so every request compresses.
+                client.get("/api/product/?n=%d" % len(latencies), headers=headers)
+            latencies.append(time.perf_counter() - start)
+        results["cached" if cache_enabled else "uncached"] = summarize(latencies, time.perf_counter() - wall_start)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response compression")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--encoding", default="br, gzip")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    app = load_app()
+    from models import db
+    from models.product import Product
+
+    results = {"meta": {"sizes": args.sizes, "encoding": args.encoding}, "sizes": {}}
+    seeded = 0
+    for size in sorted(args.sizes):
+        seed(app, products=size - seeded, certificates=0, contacts=0, translations=0, seed_value=size)
+        seeded = size
+
+        with app.app_context():
+            count = db.session.query(Product).count()
+        body = app.test_client().get("/api/product/?raw=1", headers={"Accept-Encoding": "identity"}).get_data()
+
+        results["sizes"][str(count)] = {
+            "compression": compression_costs(app, body, args.repeat),
+            "requests": request_costs(app, args.encoding, args.requests)
+        }
+        print(count, results["sizes"][str(count)])
+
+    save_results(results, args.output, "compression")
+    return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Endpoint throughput and latency benchmark.
+
+Builds the app against a throwaway SQLite file (or --database-url, e.g. a local
+PostgreSQL), seeds it and measures every public and admin endpoint twice: in-process
+through the Flask test client, then over HTTP with a concurrent driver.
+
+    python benchmarks/bench_endpoints.py --products 5000 --concurrency 16
+    python benchmarks/bench_endpoints.py --compare benchmarks/results/bench-<old>.json
+"""
+import json
+import time
+import argparse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from common import load_app, seed, admin_token, summarize, start_server, save_results
+
+class BenchRows:
+    # Rows made by a *_create case. The patch and delete cases that follow address them
+    # by id and the delete case removes them, so every run leaves the database as seeded.
+
+    def __init__(self, app, model, column, prefix):
+        self.app = app
+        self.model = model
+        self.column = column
+        self.prefix = prefix
+        self.ids = []
+
+    def load(self):
+        with self.app.app_context():
+            rows = self.model.query.filter(self.column.like(self.prefix + "%")).order_by(self.model.id).all()
+            self.ids = [row.id for row in rows]
+        return None
+
+    def path(self, template):
+        return lambda index: template % self.ids[index % len(self.ids)]
+
+def _resolve(value, index):
+    return value(index) if callable(value) else value
+
+def endpoints(app, token):
+    from models.product import Product
+    from models.contact import Contact
+    from models.language import Language
+    from models.certificate import Certificate
+
+    with app.app_context():
+        product_id = Product.query.first().id
+        contact_id = Contact.query.first().id
+        language = Language.query.first()
+        certificate_id = Certificate.query.first().id
+
+    admin = {"Authorization": "Bearer %s" % token}
+    # Each submission differs, otherwise the duplicate filter answers 409 from the second on.
+    contact_body = lambda index: {"full_name": "Bench", "phone_number": "+998900000000", "subject": "Bench", "message": "Bench %d %f" % (index, time.time())}
+    products = BenchRows(app, Product, Product.title, "Bench product ")
+    certificates = BenchRows(app, Certificate, Certificate.title, "Bench certificate ")
+    languages = BenchRows(app, Language, Language.code, "bench_")
+    # (name, method, path, headers, body, setup); path and body may be callables of the
+    # request index, setup runs once before the case in each mode.
+    return [
+        ("product_list", "GET", "/api/product/", None, None, None),
+        ("product_get", "GET", "/api/product/%d" % product_id, None, None, None),
+        ("certificate_list", "GET", "/api/certificate/", None, None, None),
+        ("certificate_get", "GET", "/api/certificate/%d" % certificate_id, None, None, None),
+        ("language_lookup", "GET", "/api/language/user/%s/%s" % (language.lang, language.code), None, None, None),
+        ("contact_create", "POST", "/api/contact/", None, contact_body, None),
+        ("admin_contact_list", "GET", "/api/contact/", admin, None, None),
+        ("admin_contact_get", "GET", "/api/contact/%d" % contact_id, admin, None, None),
+        ("admin_language_list", "GET", "/api/language/", admin, None, None),
+        ("admin_language_get", "GET", "/api/language/%d" % language.id, admin, None, None),
+        ("admin_user_list", "GET", "/api/user/", admin, None, None),
+        ("admin_product_create", "POST", "/api/product/", admin, lambda index: {
+            "title": "Bench product %d" % index, "description": "Bench", "image_path": "/static/products/bench.jpg",
+            "proba": 585, "gramm": 1.0 + index % 50, "type": "ring"
+        }, None),
+        ("admin_product_patch", "PATCH", products.path("/api/product/%d"), admin, lambda index: {"gramm": 2.0 + index % 50}, products.load),
+        ("admin_product_delete", "DELETE", products.path("/api/product/%d"), admin, None, products.load),
+        ("admin_certificate_create", "POST", "/api/certificate/", admin, lambda index: {
+            "title": "Bench certificate %d" % index, "description": "Bench", "file_path": "/static/certificates/bench.pdf"
+        }, None),
+        ("admin_certificate_patch", "PATCH", certificates.path("/api/certificate/%d"), admin, {"description": "Bench patched"}, certificates.load),
+        ("admin_certificate_delete", "DELETE", certificates.path("/api/certificate/%d"), admin, None, certificates.load),
+        ("admin_language_create", "POST", "/api/language/", admin, lambda index: {
+            "lang": "uz", "code": "bench_%d" % index, "message": "Bench"
+        }, None),
+        ("admin_language_patch", "PATCH", languages.path("/api/language/%d"), admin, {"message": "Bench patched"}, languages.load),
+        ("admin_language_delete", "DELETE", languages.path("/api/language/%d"), admin, None, languages.load)
+    ]
+
+def bench_test_client(app, cases, requests):
+    client = app.test_client()
+    results = {}
+    for name, method, path, headers, body, setup in cases:
+        if setup is not None:
+            setup()
+        latencies, errors = [], 0
+        wall_start = time.perf_counter()
+        for index in range(requests):
+            start = time.perf_counter()
+            response = client.open(_resolve(path, index), method=method, headers=headers, json=_resolve(body, index))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+        results[name] = summarize(latencies, time.perf_counter() - wall_start, errors)
+        print("test_client %-22s %s" % (name, results[name]))
+    return results
+
+def _http_call(base_url, method, path, headers, body):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, method=method, headers=dict(headers or {}))
+    if data is not None:
+        request.add_header("Content-Type", "application/json")
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            ok = response.status < 400
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+def bench_http(app, cases, requests, concurrency):
+    server, base_url = start_server(app)
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for name, method, path, headers, body, setup in cases:
+                if setup is not None:
+                    setup()
+                wall_start = time.perf_counter()
+                calls = list(pool.map(
+                    lambda index: _http_call(base_url, method, _resolve(path, index), headers, _resolve(body, index)),
+                    range(requests)
+                ))
+                wall = time.perf_counter() - wall_start
+                latencies = [latency for latency, ok in calls]
+                errors = sum(1 for latency, ok in calls if not ok)
+                results[name] = summarize(latencies, wall, errors)
+                print("http        %-22s %s" % (name, results[name]))
+    finally:
+        server.shutdown()
+    return results
+
+def compare(current, previous_path):
+    with open(previous_path) as file:
+        previous = json.load(file)
+
+    print("\nChange against %s (positive = slower)" % previous_path)
+    for mode in ("test_client", "http"):
+        for name, stats in current.get(mode, {}).items():
+            old = previous.get(mode, {}).get(name)
+            if not old or not old.get("p50_ms") or not old.get("p99_ms"):
+                continue
+            p50 = (stats["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+            p99 = (stats["p99_ms"] - old["p99_ms"]) / old["p99_ms"] * 100
+            print("%-12s %-22s p50 %+7.1f%%  p99 %+7.1f%%" % (mode, name, p50, p99))
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Gold House API endpoints")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--certificates", type=int, default=100)
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--translations", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and mode")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="Previous results JSON to diff against")
+    args = parser.parse_args()
+
+    app = load_app(args.database_url)
+    seed(app, args.products, args.certificates, args.contacts, args.translations)
+    cases = endpoints(app, admin_token(app.test_client()))
+
+    results = {
+        "meta": {
+            "database": app.config["SQLALCHEMY_DATABASE_URI"].split("://")[0],
+            "products": args.products,
+            "certificates": args.certificates,
+            "contacts": args.contacts,
+            "translations": args.translations,
+            "requests": args.requests,
+            "concurrency": args.concurrency
+        },
+        "test_client": bench_test_client(app, cases, args.requests),
+        "http": bench_http(app, cases, args.requests, args.concurrency)
+    }
+    save_results(results, args.output, "bench")
+
+    if args.compare:
+        compare(results, args.compare)
+    return None
+
+if __name__ == "__main__":
+    main()
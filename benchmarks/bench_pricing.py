@@ -0,0 +1,76 @@
+"""Cost of pricing product pages against cached gold rates.
+
+Builds --products product dicts in memory and prices them with apply_prices against
+one rates snapshot, then times the uncached alternative (one rate query per row) on
+a small sample and extrapolates it to the full catalog.
+
+    python benchmarks/bench_pricing.py --products 100000
+"""
+import time
+import random
+import argparse
+
+from common import load_app, PROBAS, PRODUCT_TYPES, save_results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk product pricing")
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--per-row-sample", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    app = load_app()
+    from models import db
+    from models.gold_rate import GoldRate
+    from utils.pricing import apply_prices, current_rates, invalidate_rates
+
+    rnd = random.Random(7)
+    with app.app_context():
+        # A realistic history: many rates per proba, only the latest one counts.
+        db.session.add_all([GoldRate(proba, rnd.uniform(400000, 1200000), "UZS") for _ in range(50) for proba in PROBAS])
+        db.session.commit()
+
+    products = [
+        {"id": i, "proba": rnd.choice(PROBAS), "gramm": round(rnd.uniform(0.5, 60.0), 2), "type": rnd.choice(PRODUCT_TYPES)}
+        for i in range(args.products)
+    ]
+
+    results = {"meta": {"products": args.products, "page_size": args.page_size}}
+    with app.app_context():
+        invalidate_rates()
+        start = time.perf_counter()
+        rates = current_rates()
+        results["rate_load_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            apply_prices(products, rates)
+            timings.append(time.perf_counter() - start)
+        results["bulk_catalog_ms"] = round(min(timings) * 1000, 3)
+        results["bulk_per_product_us"] = round(min(timings) / args.products * 1e6, 4)
+
+        page = products[:args.page_size]
+        start = time.perf_counter()
+        for _ in range(1000):
+            apply_prices(page)
+        results["page_ms"] = round((time.perf_counter() - start), 4)
+
+        sample = products[:args.per_row_sample]
+        start = time.perf_counter()
+        for product in sample:
+            rate = GoldRate.query.filter_by(proba=product["proba"]).order_by(GoldRate.id.desc()).first()
+            product["price"] = round(product["gramm"] * rate.price_per_gramm, 2)
+        per_row = (time.perf_counter() - start) / len(sample)
+        results["per_row_query_per_product_us"] = round(per_row * 1e6, 2)
+        results["per_row_query_catalog_ms_estimate"] = round(per_row * args.products * 1000, 1)
+
+    for key, value in results.items():
+        print("%-36s %s" % (key, value))
+    save_results(results, args.output, "pricing")
+    return None
+
+if __name__ == "__main__":
+    main()
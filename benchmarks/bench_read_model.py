@@ -0,0 +1,87 @@
+"""Memory footprint and latency of the in-memory product read model.
+
+Grows one SQLite database to each --products size in turn and compares, per 10k products,
+the memory held by the read model against the ORM objects plus to_dict() dicts a
+request materializes today, then times list and detail reads through the test client
+with the read model off and on (response cache disabled).
+
+    python benchmarks/bench_read_model.py --products 10000 50000
+"""
+import os
+import gc
+import time
+import random
+import argparse
+import tracemalloc
+
+from common import load_app, seed, summarize, save_results
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return kept, used
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the product read model")
+    parser.add_argument("--products", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    os.environ["RESPONSE_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("WARMUP_MODE", "off")
+    app = load_app()
+    from models.product import Product
+    from utils.read_model import ProductReadModel
+
+    results = {"meta": {"requests": args.requests}, "sizes": {}}
+    seeded = 0
+    for products in sorted(args.products):
+        seed(app, products - seeded, certificates=0, contacts=0, translations=0, seed_value=products)
+        seeded = products
+
+        with app.app_context():
+            orm, orm_bytes = _measure(lambda: [(product, Product.to_dict(product)) for product in Product.query.all()])
+            del orm
+            model = ProductReadModel()
+            count, model_bytes = _measure(model.load)
+            del model
+
+        client = app.test_client()
+        rnd = random.Random(5)
+        timings = {}
+        for mode in ("orm", "read_model"):
+            app.config["PRODUCT_READ_MODEL"] = mode == "read_model"
+            for name, path in (("list", lambda: "/api/product/?sort=-gramm"), ("detail", lambda: "/api/product/%d" % rnd.randint(1, products))):
+                client.get(path())
+                requests = args.requests if name == "detail" else max(args.requests // 10, 5)
+                latencies = []
+                total_start = time.perf_counter()
+                for _ in range(requests):
+                    start = time.perf_counter()
+                    client.get(path())
+                    latencies.append(time.perf_counter() - start)
+                timings["%s_%s" % (mode, name)] = summarize(latencies, time.perf_counter() - total_start)
+
+        scale = 10000.0 / products
+        results["sizes"][str(products)] = {
+            "orm_bytes_per_10k": int(orm_bytes * scale),
+            "read_model_bytes_per_10k": int(model_bytes * scale),
+            "latency": timings
+        }
+        print("%7d products orm %.1f MB/10k, read model %.1f MB/10k" % (
+            products, orm_bytes * scale / 2 ** 20, model_bytes * scale / 2 ** 20
+        ))
+        for name, summary in timings.items():
+            print("    %-18s %s" % (name, summary))
+
+    save_results(results, args.output, "bench-read-model")
+    return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Latency of similar-product lookups against the in-memory neighbour index.
+
+Fills the index directly with --products synthetic rows (no database) and times
+neighbours() for random products, plus the cost of incremental upserts and removals.
+
+    python benchmarks/bench_similar.py --products 10000 100000
+"""
+import time
+import random
+import argparse
+
+from common import load_app, PROBAS, PRODUCT_TYPES, summarize, save_results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the similar-product index")
+    parser.add_argument("--products", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    app = load_app()
+    from utils.similar import SimilarIndex
+
+    rnd = random.Random(11)
+    results = {"meta": {"queries": args.queries, "k": args.k}, "sizes": {}}
+    for products in args.products:
+        index = SimilarIndex()
+        start = time.perf_counter()
+        for product_id in range(1, products + 1):
+            index._upsert(product_id, rnd.choice(PRODUCT_TYPES), rnd.choice(PROBAS), rnd.uniform(0.5, 60.0))
+        build = time.perf_counter() - start
+        index.loaded_at = time.monotonic()
+
+        with app.test_request_context():
+            latencies = []
+            for _ in range(args.queries):
+                product_id = rnd.randint(1, products)
+                start = time.perf_counter()
+                index.neighbours(product_id, args.k)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for product_id in range(1, 1001):
+            index._remove(product_id)
+            index._upsert(product_id, rnd.choice(PRODUCT_TYPES), rnd.choice(PROBAS), rnd.uniform(0.5, 60.0))
+        update = (time.perf_counter() - start) / 1000
+
+        results["sizes"][str(products)] = {
+            "build_ms": round(build * 1000, 3),
+            "update_us": round(update * 1e6, 3),
+            "index_bytes": int(index.ids.nbytes + index.types.nbytes + index.probas.nbytes + index.gramms.nbytes),
+            "query": summarize(latencies, sum(latencies))
+        }
+        print("%7d products %s" % (products, results["sizes"][str(products)]))
+
+    save_results(results, args.output, "bench-similar")
+    return None
+
+if __name__ == "__main__":
+    main()
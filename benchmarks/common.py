@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+PRODUCT_TYPES = ["ring", "necklace", "bracelet", "earring", "chain", "pendant"]
+PROBAS = [375, 500, 583, 585, 750, 916, 999]
+LANGS = ["uz", "ru", "en"]
+
+def load_app(database_url=None):
+    # app.py configures itself from the environment at import time, so this must run
+    # before the first "import app".
+    if database_url is None:
+        database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="gold_house_bench_"), "bench.db")
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("RATELIMIT_ENABLED", "0")
+
+    from app import app
+    return app
+
+def seed(app, products=1000, certificates=100, contacts=1000, translations=200, seed_value=42):
+    from models import db
+    from models.product import Product
+    from models.contact import Contact
+    from models.language import Language
+    from models.certificate import Certificate
+
+    rnd = random.Random(seed_value)
+    with app.app_context():
+        db.session.add_all([
+            Product(
+                "Product %d" % i, "Description of product %d " % i * 4, "/static/products/%d.jpg" % i,
+                rnd.choice(PROBAS), round(rnd.uniform(0.5, 60.0), 2), rnd.choice(PRODUCT_TYPES)
+            )
+            for i in range(products)
+        ])
+        db.session.add_all([
+            Certificate("Certificate %d" % i, "Certificate description %d" % i, "/static/certificates/%d.pdf" % i)
+            for i in range(certificates)
+        ])
+        db.session.add_all([
+            Contact("Client %d" % i, "+99890%07d" % i, "Subject %d" % i, "Message body %d " % i * 8)
+            for i in range(contacts)
+        ])
+        db.session.add_all([
+            Language(LANGS[i % len(LANGS)], "code_%d" % (i // len(LANGS)), "Message %d" % i)
+            for i in range(translations)
+        ])
+        db.session.commit()
+
+    return None
+
+def admin_token(client, username="akbarov504", password="12345678"):
+    response = client.post("/api/auth/login", json={"username": username, "password": password})
+    return response.get_json()["result"]["access_token"]
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(latencies, wall_seconds, errors=0):
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds else None,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else None,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3) if values else None,
+        "p90_ms": round(percentile(values, 0.90) * 1000, 3) if values else None,
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3) if values else None,
+        "max_ms": round(values[-1] * 1000, 3) if values else None
+    }
+
+def start_server(app, host="127.0.0.1"):
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server(host, 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, "http://%s:%d" % (host, server.server_port)
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+def save_results(results, output=None, name="bench"):
+    if output is None:
+        results_dir = os.path.join(ROOT, "benchmarks", "results")
+        os.makedirs(results_dir, exist_ok=True)
+        output = os.path.join(results_dir, "%s-%s.json" % (name, datetime.now().strftime("%Y%m%d-%H%M%S")))
+
+    results.setdefault("meta", {}).update({
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "created_at": datetime.now().isoformat(timespec="seconds")
+    })
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print("Results written to %s" % output)
+    return output
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
@@ -0,0 +1,38 @@
+"""Production WSGI server settings.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Metrics are aggregated across workers with prometheus_client's multiprocess mode, which
+reads PROMETHEUS_MULTIPROC_DIR when prometheus_client is first imported. This file
+sets it (default /tmp/gold_house_metrics, override it in the environment) before
+gunicorn loads the app, and empties it on every start. Any other server that runs
+several processes must export PROMETHEUS_MULTIPROC_DIR, pointing to an existing
+empty directory, before it starts.
+"""
+import os
+import shutil
+
+bind = "0.0.0.0:5050"
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+# Shared directory for prometheus_client multiprocess mode. It must be set before
+# the application (and so prometheus_client) is imported by any worker.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/gold_house_metrics")
+
+def on_starting(server):
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+def post_worker_init(worker):
+    # Runs in each worker after the app is loaded and before it accepts connections,
+    # so WARMUP_MODE=sync keeps a cold worker out of rotation until it is warm.
+    from utils.warmup import start_warmup
+    from utils.invalidation import start_listener
+    start_listener()
+    start_warmup(worker.wsgi)
@@ -0,0 +1,40 @@
+import pytz
+from models import db
+from datetime import datetime
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+class AuditLog(db.Model):
+    __tablename__ = "audit_log"
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer(), "sqlite"), primary_key=True)
+
+    actor = db.Column(db.String(100), nullable=True)
+    entity = db.Column(db.String(50), nullable=False)
+    entity_id = db.Column(db.String(50), nullable=True)
+    action = db.Column(db.String(10), nullable=False)
+    changes = db.Column(db.JSON(), nullable=False)
+
+    created_at = db.Column(db.DateTime(), nullable=False, default=lambda: datetime.now(time_zone))
+
+    def __init__(self, actor, entity, entity_id, action, changes, created_at=None):
+        super().__init__()
+        self.actor = actor
+        self.entity = entity
+        self.entity_id = entity_id
+        self.action = action
+        self.changes = changes
+        self.created_at = created_at
+
+    @staticmethod
+    def to_dict(audit_log):
+        _ = {
+            "id": audit_log.id,
+            "actor": audit_log.actor,
+            "entity": audit_log.entity,
+            "entity_id": audit_log.entity_id,
+            "action": audit_log.action,
+            "changes": audit_log.changes,
+            "created_at": str(audit_log.created_at)
+        }
+        return _
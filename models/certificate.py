@@ -15,6 +15,8 @@ class Certificate(db.Model):
 
     created_at = db.Column(db.DateTime(), default=datetime.now(time_zone))
 
+    translations = db.relationship("CertificateTranslation", cascade="all, delete-orphan")
+
     def __init__(self, title, description, file_path):
         super().__init__()
         self.title = title
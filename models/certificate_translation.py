@@ -0,0 +1,39 @@
+import pytz
+from models import db
+from datetime import datetime
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+class CertificateTranslation(db.Model):
+    __tablename__ = "certificate_translation"
+    __table_args__ = (
+        db.UniqueConstraint("certificate_id", "lang", name="uq_certificate_translation_certificate_lang"),
+    )
+
+    id = db.Column(db.Integer(), primary_key=True)
+
+    certificate_id = db.Column(db.Integer(), db.ForeignKey("certificate.id", ondelete="CASCADE"), nullable=False)
+    lang = db.Column(db.String(10), nullable=False)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text(), nullable=False)
+
+    created_at = db.Column(db.DateTime(), default=lambda: datetime.now(time_zone))
+
+    def __init__(self, certificate_id, lang, title, description):
+        super().__init__()
+        self.certificate_id = certificate_id
+        self.lang = lang
+        self.title = title
+        self.description = description
+
+    @staticmethod
+    def to_dict(certificate_translation):
+        _ = {
+            "id": certificate_translation.id,
+            "certificate_id": certificate_translation.certificate_id,
+            "lang": certificate_translation.lang,
+            "title": certificate_translation.title,
+            "description": certificate_translation.description,
+            "created_at": str(certificate_translation.created_at)
+        }
+        return _
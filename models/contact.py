@@ -4,8 +4,18 @@ from datetime import datetime
 
 time_zone = pytz.timezone("Asia/Tashkent")
 
+CONTACT_STATUSES = ("new", "read", "handled")
+
 class Contact(db.Model):
     __tablename__ = "contact"
+    __table_args__ = (
+        # Only the open part of the inbox is indexed; handled rows are the bulk of the table.
+        db.Index(
+            "ix_contact_unhandled_created_at", "status", "created_at",
+            postgresql_where=db.text("status <> 'handled'"),
+            sqlite_where=db.text("status <> 'handled'")
+        ),
+    )
 
     id = db.Column(db.Integer(), primary_key=True)
 
@@ -13,8 +23,10 @@ class Contact(db.Model):
     phone_number = db.Column(db.String(20), nullable=False)
     subject = db.Column(db.String(100), nullable=False)
     message = db.Column(db.Text(), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="new", server_default="new")
 
-    created_at = db.Column(db.DateTime(), default=datetime.now(time_zone))
+    # Evaluated per row: contacts are range-partitioned on created_at.
+    created_at = db.Column(db.DateTime(), nullable=False, default=lambda: datetime.now(time_zone))
 
     def __init__(self, full_name, phone_number, subject, message):
         super().__init__()
@@ -22,6 +34,7 @@ class Contact(db.Model):
         self.phone_number = phone_number
         self.subject = subject
         self.message = message
+        self.status = "new"
 
     @staticmethod
     def to_dict(contact):
@@ -31,6 +44,7 @@ class Contact(db.Model):
             "phone_number": contact.phone_number,
             "subject": contact.subject,
             "message": contact.message,
+            "status": contact.status,
             "created_at": str(contact.created_at)
         }
         return _
@@ -0,0 +1,33 @@
+import pytz
+from models import db
+from datetime import datetime
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+class GoldRate(db.Model):
+    __tablename__ = "gold_rate"
+
+    id = db.Column(db.Integer(), primary_key=True)
+
+    proba = db.Column(db.Integer(), nullable=False, index=True)
+    price_per_gramm = db.Column(db.Float(), nullable=False)
+    currency = db.Column(db.String(10), nullable=False)
+
+    created_at = db.Column(db.DateTime(), default=lambda: datetime.now(time_zone))
+
+    def __init__(self, proba, price_per_gramm, currency):
+        super().__init__()
+        self.proba = proba
+        self.price_per_gramm = price_per_gramm
+        self.currency = currency
+
+    @staticmethod
+    def to_dict(gold_rate):
+        _ = {
+            "id": gold_rate.id,
+            "proba": gold_rate.proba,
+            "price_per_gramm": gold_rate.price_per_gramm,
+            "currency": gold_rate.currency,
+            "created_at": str(gold_rate.created_at)
+        }
+        return _
@@ -0,0 +1,61 @@
+import pytz
+from models import db
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+class Job(db.Model):
+    __tablename__ = "job"
+    __table_args__ = (
+        # Workers poll for due work; finished jobs stay out of the index.
+        db.Index(
+            "ix_job_due", "run_at", "id",
+            postgresql_where=db.text("status IN ('queued', 'running')"),
+            sqlite_where=db.text("status IN ('queued', 'running')")
+        ),
+    )
+
+    id = db.Column(db.Integer(), primary_key=True)
+
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON(), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+    attempts = db.Column(db.Integer(), nullable=False, default=0)
+    max_attempts = db.Column(db.Integer(), nullable=False, default=5)
+    run_at = db.Column(db.DateTime(), nullable=False)
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime(), nullable=True)
+    last_error = db.Column(db.Text(), nullable=True)
+    result = db.Column(db.JSON(), nullable=True)
+
+    created_at = db.Column(db.DateTime(), nullable=False)
+    finished_at = db.Column(db.DateTime(), nullable=True)
+
+    def __init__(self, kind, payload, max_attempts, run_at, created_at):
+        super().__init__()
+        self.kind = kind
+        self.payload = payload
+        self.status = "queued"
+        self.attempts = 0
+        self.max_attempts = max_attempts
+        self.run_at = run_at
+        self.created_at = created_at
+
+    @staticmethod
+    def to_dict(job):
+        _ = {
+            "id": job.id,
+            "kind": job.kind,
+            "payload": job.payload,
+            "status": job.status,
+            "attempts": job.attempts,
+            "max_attempts": job.max_attempts,
+            "run_at": str(job.run_at),
+            "locked_by": job.locked_by,
+            "last_error": job.last_error,
+            "result": job.result,
+            "created_at": str(job.created_at),
+            "finished_at": str(job.finished_at) if job.finished_at else None
+        }
+        return _
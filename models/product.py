@@ -15,8 +15,17 @@ class Product(db.Model):
     proba = db.Column(db.Integer(), nullable=False)
     gramm = db.Column(db.Float(), nullable=False)
     type = db.Column(db.String(100), nullable=False)
+    image_variants = db.Column(db.JSON(), nullable=True)
 
     created_at = db.Column(db.DateTime(), default=datetime.now(time_zone))
+    # Bumped on every product write (and by translation writes) so per-worker read models
+    # can pick up changes made by other workers.
+    updated_at = db.Column(
+        db.DateTime(), nullable=True, index=True,
+        default=lambda: datetime.now(time_zone), onupdate=lambda: datetime.now(time_zone)
+    )
+
+    translations = db.relationship("ProductTranslation", cascade="all, delete-orphan")
 
     def __init__(self, title, description, image_path, proba, gramm, type):
         super().__init__()
@@ -28,12 +37,16 @@ class Product(db.Model):
         self.type = type
 
     @staticmethod
-    def to_dict(product):
+    def to_dict(product, image_size=None):
+        image_path = product.image_path
+        if image_size and product.image_variants:
+            image_path = product.image_variants.get(image_size, image_path)
+
         _ = {
             "id": product.id,
             "title": product.title,
             "description": product.description,
-            "image_path": product.image_path,
+            "image_path": image_path,
             "proba": product.proba,
             "gramm": product.gramm,
             "type": product.type,
@@ -0,0 +1,27 @@
+from models import db
+
+class ProductStat(db.Model):
+    __tablename__ = "product_stat"
+
+    type = db.Column(db.String(100), primary_key=True)
+    proba = db.Column(db.Integer(), primary_key=True)
+
+    count = db.Column(db.Integer(), nullable=False, default=0)
+    total_gramm = db.Column(db.Float(), nullable=False, default=0.0)
+
+    def __init__(self, type, proba, count=0, total_gramm=0.0):
+        super().__init__()
+        self.type = type
+        self.proba = proba
+        self.count = count
+        self.total_gramm = total_gramm
+
+    @staticmethod
+    def to_dict(product_stat):
+        _ = {
+            "type": product_stat.type,
+            "proba": product_stat.proba,
+            "count": product_stat.count,
+            "total_gramm": product_stat.total_gramm
+        }
+        return _
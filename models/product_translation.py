@@ -0,0 +1,39 @@
+import pytz
+from models import db
+from datetime import datetime
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+class ProductTranslation(db.Model):
+    __tablename__ = "product_translation"
+    __table_args__ = (
+        db.UniqueConstraint("product_id", "lang", name="uq_product_translation_product_lang"),
+    )
+
+    id = db.Column(db.Integer(), primary_key=True)
+
+    product_id = db.Column(db.Integer(), db.ForeignKey("product.id", ondelete="CASCADE"), nullable=False)
+    lang = db.Column(db.String(10), nullable=False)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text(), nullable=False)
+
+    created_at = db.Column(db.DateTime(), default=lambda: datetime.now(time_zone))
+
+    def __init__(self, product_id, lang, title, description):
+        super().__init__()
+        self.product_id = product_id
+        self.lang = lang
+        self.title = title
+        self.description = description
+
+    @staticmethod
+    def to_dict(product_translation):
+        _ = {
+            "id": product_translation.id,
+            "product_id": product_translation.product_id,
+            "lang": product_translation.lang,
+            "title": product_translation.title,
+            "description": product_translation.description,
+            "created_at": str(product_translation.created_at)
+        }
+        return _
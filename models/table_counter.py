@@ -0,0 +1,15 @@
+from models import db
+
+class TableCounter(db.Model):
+    __tablename__ = "table_counter"
+
+    name = db.Column(db.String(50), primary_key=True)
+
+    count = db.Column(db.Integer(), nullable=False, default=0)
+    reconciled_at = db.Column(db.DateTime(), nullable=True)
+
+    def __init__(self, name, count=0, reconciled_at=None):
+        super().__init__()
+        self.name = name
+        self.count = count
+        self.reconciled_at = reconciled_at
@@ -1,6 +1,7 @@
 import pytz
 from models import db
 from datetime import datetime
+from utils.metrics import bcrypt_timer
 from flask_bcrypt import generate_password_hash
 
 time_zone = pytz.timezone("Asia/Tashkent")
@@ -22,7 +23,8 @@ class User(db.Model):
         self.full_name = full_name
         self.phone_number = phone_number
         self.username = username
-        self.password = generate_password_hash(password).decode("utf-8")
+        with bcrypt_timer("hash"):
+            self.password = generate_password_hash(password).decode("utf-8")
 
     @staticmethod
     def to_dict(user):
@@ -0,0 +1,68 @@
+from flask import Blueprint, request
+from models.audit_log import AuditLog
+from utils.utils import get_response
+from utils.decorators import login_required
+from flask_restful import Api, Resource
+
+audit_bp = Blueprint("audit", __name__, url_prefix="/api/audit")
+api = Api(audit_bp)
+
+class AuditLogListResource(Resource):
+    decorators = [login_required()]
+
+    def get(self):
+        """Audit Log List API
+        Path - /api/audit
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: after_id
+              in: query
+              type: integer
+              required: false
+              description: Return records with an id greater than this one
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, at most 500 (default 50)
+
+            - name: entity
+              in: query
+              type: string
+              required: false
+              description: Only records for this entity (product, product_translation, certificate, ...)
+
+            - name: entity_id
+              in: query
+              type: string
+              required: false
+              description: Only records for this entity id
+        responses:
+            200:
+                description: Return a page of audit records in id order
+        """
+        after_id = request.args.get("after_id", 0, type=int)
+        limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+
+        audit_query = AuditLog.query.filter(AuditLog.id > after_id)
+        entity = request.args.get("entity")
+        if entity:
+            audit_query = audit_query.filter(AuditLog.entity == entity)
+        entity_id = request.args.get("entity_id")
+        if entity_id:
+            audit_query = audit_query.filter(AuditLog.entity_id == entity_id)
+
+        audit_list = audit_query.order_by(AuditLog.id).limit(limit).all()
+        result_audit_list = [AuditLog.to_dict(audit_log) for audit_log in audit_list]
+        return get_response("Audit Log List", result_audit_list, 200), 200
+
+api.add_resource(AuditLogListResource, "/")
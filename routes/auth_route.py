@@ -1,6 +1,7 @@
 from flask import Blueprint
 from models.user import User
 from utils.utils import get_response
+from utils.metrics import bcrypt_timer
 from flask_bcrypt import check_password_hash
 from flask_restful import Api, Resource, reqparse
 from flask_jwt_extended import create_access_token
@@ -48,7 +49,9 @@ class AuthResource(Resource):
         if not user:
             return get_response("Username or Password is incorrect", None, 404), 404
         
-        if not check_password_hash(user.password, password):
+        with bcrypt_timer("check"):
+            password_ok = check_password_hash(user.password, password)
+        if not password_ok:
             return get_response("Username or Password is incorrect", None, 404), 404
         
         access_token = create_access_token(identity=user.username)
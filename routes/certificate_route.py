@@ -1,7 +1,14 @@
+import os
 from models import db
-from flask import Blueprint
+from flask import Blueprint, Response, current_app, request, send_from_directory
 from utils.utils import get_response
+from utils.cache import cached_response
+from utils.singleflight import single_flight
+from utils.storage import upload_dir, store_stream, file_extension, is_stored_name
+from utils.counters import counter_add, get_count
+from utils.localization import resolve_lang, is_default_lang, localized_query, localize
 from models.certificate import Certificate
+from models.certificate_translation import CertificateTranslation
 from utils.decorators import login_required
 from flask_restful import Api, Resource, reqparse
 
@@ -15,11 +22,25 @@ certificate_update_parse.add_argument("title", type=str)
 certificate_update_parse.add_argument("description", type=str)
 certificate_update_parse.add_argument("file_path", type=str)
 
+certificate_translation_parse = reqparse.RequestParser()
+certificate_translation_parse.add_argument("title", type=str, required=True, help="Title cannot be blank")
+certificate_translation_parse.add_argument("description", type=str, required=True, help="Description cannot be blank")
+
+CERTIFICATE_FILE_URL = "/api/certificate/file/"
+CERTIFICATE_FILE_EXTENSIONS = ("pdf", "jpg", "png")
+CERTIFICATE_CONTENT_TYPES = {
+    "application/pdf": "pdf",
+    "image/jpeg": "jpg",
+    "image/png": "png"
+}
+
 certificate_bp = Blueprint("certificate", __name__, url_prefix="/api/certificate")
 api = Api(certificate_bp)
 
 class CertificateResource(Resource):
     
+    @cached_response("certificate", localized=True)
+    @single_flight("certificate", localized=True)
     def get(self, certificate_id):
         """Certificate Get API
         Path - /api/certificate/<certificate_id>
@@ -32,17 +53,26 @@ class CertificateResource(Resource):
               type: integer
               required: true
               description: Enter Certificate ID
+
+            - name: lang
+              in: query
+              type: string
+              required: false
+              description: Content language, overrides the Accept-Language header
         responses:
             200:
                 description: Return a Certificate
             404:
                 description: Certificate not found
         """
-        certificate = Certificate.query.filter_by(id=certificate_id).first()
-        if not certificate:
+        lang = resolve_lang()
+        row = localized_query(Certificate, CertificateTranslation, CertificateTranslation.certificate_id, lang).filter(Certificate.id == certificate_id).first()
+        if not row:
             return get_response("Certificate not found", None, 404), 404
         
-        return get_response("Certificate successfully found", Certificate.to_dict(certificate), 200), 200
+        certificate, title, description = row
+        result_certificate = localize(Certificate.to_dict(certificate), title, description)
+        return get_response("Certificate successfully found", result_certificate, 200), 200
 
     @login_required()
     def delete(self, certificate_id):
@@ -73,6 +103,7 @@ class CertificateResource(Resource):
         if not certificate:
             return get_response("Certificate not found", None, 404), 404
         
+        counter_add("certificate", -1)
         db.session.delete(certificate)
         db.session.commit()
         return get_response("Successfully deleted certificate", None, 200), 200
@@ -136,19 +167,39 @@ class CertificateResource(Resource):
 
 class CertificateListCreateResource(Resource):
 
+    @cached_response("certificate", localized=True)
+    @single_flight("certificate", localized=True)
     def get(self):
         """Certificate List API
         Path - /api/certificate
         Method - GET
         ---
         consumes: application/json
+        parameters:
+            - name: count
+              in: query
+              type: string
+              enum: [exact, estimate]
+              required: false
+              description: Include a total count, estimate uses planner statistics on PostgreSQL
+
+            - name: lang
+              in: query
+              type: string
+              required: false
+              description: Content language, overrides the Accept-Language header
         responses:
             200:
                 description: Return Certificate List
         """
-        certificate_list = Certificate.query.filter_by().order_by(Certificate.created_at.desc()).all()
-        result_certificate_list = [Certificate.to_dict(certificate) for certificate in certificate_list]
-        return get_response("Certificate List", result_certificate_list, 200), 200
+        lang = resolve_lang()
+        certificate_list = localized_query(Certificate, CertificateTranslation, CertificateTranslation.certificate_id, lang).order_by(Certificate.created_at.desc()).all()
+        result_certificate_list = [
+            localize(Certificate.to_dict(certificate), title, description)
+            for certificate, title, description in certificate_list
+        ]
+        count = get_count("certificate", request.args.get("count"))
+        return get_response("Certificate List", result_certificate_list, 200, count), 200
 
     @login_required()
     def post(self):
@@ -190,8 +241,258 @@ class CertificateListCreateResource(Resource):
         
         new_certificate = Certificate(title, description, file_path)
         db.session.add(new_certificate)
+        counter_add("certificate", 1)
         db.session.commit()
         return get_response("Successfully created certificate", new_certificate.id, 200), 200
 
+class CertificateFileUploadResource(Resource):
+
+    @login_required()
+    def put(self, certificate_id):
+        """Certificate File Upload API
+        Path - /api/certificate/<certificate_id>/file
+        Method - PUT
+        ---
+        consumes: [application/pdf, image/jpeg, image/png]
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: certificate_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Certificate ID
+
+            - name: filename
+              in: query
+              type: string
+              required: false
+              description: Original file name, used when Content-Type is not set
+
+            - name: body
+              in: body
+              required: true
+              description: Raw file bytes, plain or chunked transfer encoding
+              schema:
+                type: string
+                format: binary
+        responses:
+            200:
+                description: Return the content-addressed file path
+            400:
+                description: File is Blank or has an unsupported type
+            404:
+                description: Certificate not found
+        """
+        found_certificate = Certificate.query.filter_by(id=certificate_id).first()
+        if not found_certificate:
+            return get_response("Certificate not found", None, 404), 404
+
+        extension = CERTIFICATE_CONTENT_TYPES.get(request.mimetype)
+        if extension is None:
+            extension = file_extension(request.args.get("filename"), CERTIFICATE_FILE_EXTENSIONS)
+        if extension is None:
+            return get_response("File type is not supported", None, 400), 400
+
+        # request.stream reads the body incrementally (including chunked uploads),
+        # so large scans go straight to disk instead of into worker memory.
+        directory = upload_dir("certificates")
+        digest, name, size = store_stream(request.stream, directory, extension)
+        if size == 0:
+            os.remove(os.path.join(directory, name))
+            return get_response("File cannot be blank", None, 400), 400
+
+        found_certificate.file_path = CERTIFICATE_FILE_URL + name
+        db.session.commit()
+        result_data = {
+            "file_path": found_certificate.file_path,
+            "size": size
+        }
+        return get_response("Successfully uploaded certificate file", result_data, 200), 200
+
+class CertificateFileResource(Resource):
+
+    def get(self, filename):
+        """Certificate File API
+        Path - /api/certificate/file/<filename>
+        Method - GET
+        ---
+        parameters:
+            - name: filename
+              in: path
+              type: string
+              required: true
+              description: Content-addressed file name
+
+            - name: Range
+              in: header
+              type: string
+              required: false
+              description: Byte range, e.g. bytes=0-1023
+        responses:
+            200:
+                description: Return the file
+            206:
+                description: Return the requested byte range
+            304:
+                description: File not modified
+            404:
+                description: File not found
+        """
+        if not is_stored_name(filename, CERTIFICATE_FILE_EXTENSIONS):
+            return get_response("File not found", None, 404), 404
+
+        accel_prefix = current_app.config.get("CERTIFICATE_X_ACCEL_PREFIX")
+        if accel_prefix:
+            # Let nginx serve the bytes from its internal location.
+            response = Response(status=200)
+            response.headers["X-Accel-Redirect"] = accel_prefix.rstrip("/") + "/" + filename
+        else:
+            # conditional=True handles Range, If-Modified-Since and ETags, and the file is
+            # passed to wsgi.file_wrapper so the server can use sendfile.
+            response = send_from_directory(upload_dir("certificates"), filename, conditional=True, max_age=31536000)
+
+        response.cache_control.public = True
+        response.cache_control.max_age = 31536000
+        response.cache_control.immutable = True
+        return response
+
+class CertificateTranslationListResource(Resource):
+
+    def get(self, certificate_id):
+        """Certificate Translation List API
+        Path - /api/certificate/<certificate_id>/translation
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - name: certificate_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Certificate ID
+        responses:
+            200:
+                description: Return every translation of the Certificate
+        """
+        translation_list = CertificateTranslation.query.filter_by(certificate_id=certificate_id).order_by(CertificateTranslation.lang).all()
+        result_translation_list = [CertificateTranslation.to_dict(translation) for translation in translation_list]
+        return get_response("Certificate Translation List", result_translation_list, 200), 200
+
+class CertificateTranslationResource(Resource):
+    decorators = [login_required()]
+
+    def put(self, certificate_id, lang):
+        """Certificate Translation Save API
+        Path - /api/certificate/<certificate_id>/translation/<lang>
+        Method - PUT
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: certificate_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Certificate ID
+
+            - name: lang
+              in: path
+              type: string
+              required: true
+              description: Enter Language Lang
+
+            - name: body
+              in: body
+              required: true
+              schema:
+                type: object
+                properties:
+                    title:
+                        type: string
+                    description:
+                        type: string
+                required: [title, description]
+        responses:
+            200:
+                description: Return the Translation ID
+            400:
+                description: Language is not supported or is the default language
+            404:
+                description: Certificate not found
+        """
+        found_certificate = Certificate.query.filter_by(id=certificate_id).first()
+        if not found_certificate:
+            return get_response("Certificate not found", None, 404), 404
+
+        if lang not in current_app.config["SUPPORTED_LANGUAGES"] or is_default_lang(lang):
+            return get_response("Language is not supported or is the default language", None, 400), 400
+
+        data = certificate_translation_parse.parse_args()
+        title = data['title']
+        description = data['description']
+
+        found_translation = CertificateTranslation.query.filter_by(certificate_id=found_certificate.id, lang=lang).first()
+        if found_translation is None:
+            found_translation = CertificateTranslation(found_certificate.id, lang, title, description)
+            db.session.add(found_translation)
+        else:
+            found_translation.title = title
+            found_translation.description = description
+
+        db.session.commit()
+        return get_response("Successfully saved certificate translation", found_translation.id, 200), 200
+
+    def delete(self, certificate_id, lang):
+        """Certificate Translation Delete API
+        Path - /api/certificate/<certificate_id>/translation/<lang>
+        Method - DELETE
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: certificate_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Certificate ID
+
+            - name: lang
+              in: path
+              type: string
+              required: true
+              description: Enter Language Lang
+        responses:
+            200:
+                description: Delete a Translation
+            404:
+                description: Translation not found
+        """
+        translation = CertificateTranslation.query.filter_by(certificate_id=certificate_id, lang=lang).first()
+        if not translation:
+            return get_response("Translation not found", None, 404), 404
+
+        db.session.delete(translation)
+        db.session.commit()
+        return get_response("Successfully deleted certificate translation", None, 200), 200
+
 api.add_resource(CertificateResource, "/<certificate_id>")
 api.add_resource(CertificateListCreateResource, "/")
+api.add_resource(CertificateFileUploadResource, "/<certificate_id>/file")
+api.add_resource(CertificateFileResource, "/file/<filename>")
+api.add_resource(CertificateTranslationListResource, "/<certificate_id>/translation")
+api.add_resource(CertificateTranslationResource, "/<certificate_id>/translation/<lang>")
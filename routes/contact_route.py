@@ -1,8 +1,11 @@
 from models import db
-from flask import Blueprint
-from models.contact import Contact
+from flask import Blueprint, request
+from models.contact import Contact, CONTACT_STATUSES
 from utils.utils import get_response
 from utils.decorators import login_required
+from utils.counters import counter_add, get_count
+from utils.contact_partitions import recent_contacts_since
+from utils.dedup import is_duplicate_contact, remember_contact, contact_dedup_stats
 from flask_restful import Api, Resource, reqparse
 
 contact_parse = reqparse.RequestParser()
@@ -11,6 +14,10 @@ contact_parse.add_argument("phone_number", type=str, required=True, help="Phone
 contact_parse.add_argument("subject", type=str, required=True, help="Subject cannot be blank")
 contact_parse.add_argument("message", type=str, required=True, help="Message cannot be blank")
 
+contact_status_parse = reqparse.RequestParser()
+contact_status_parse.add_argument("ids", type=int, action="append", location="json", required=True, help="Ids cannot be blank")
+contact_status_parse.add_argument("status", type=str, choices=CONTACT_STATUSES, location="json", required=True, help="Status must be one of new, read, handled")
+
 contact_bp = Blueprint("contact", __name__, url_prefix="/api/contact")
 api = Api(contact_bp)
 
@@ -71,10 +78,14 @@ class ContactResource(Resource):
             404:
                 description: Contact not found
         """
-        contact = Contact.query.filter_by(id=contact_id).first()
+        # Locked so a concurrent status change cannot move contact_unread for the same row.
+        contact = Contact.query.filter_by(id=contact_id).with_for_update().first()
         if not contact:
             return get_response("Contact not found", None, 404), 404
         
+        counter_add("contact", -1)
+        if contact.status == "new":
+            counter_add("contact_unread", -1)
         db.session.delete(contact)
         db.session.commit()
         return get_response("Successfully deleted contact", None, 200), 200
@@ -95,13 +106,43 @@ class ContactListCreateResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: count
+              in: query
+              type: string
+              enum: [exact, estimate]
+              required: false
+              description: Include a total count, estimate uses planner statistics on PostgreSQL
+
+            - name: all
+              in: query
+              type: boolean
+              required: false
+              description: Include contacts older than CONTACT_LIST_RECENT_MONTHS
+
+            - name: status
+              in: query
+              type: string
+              enum: [new, read, handled]
+              required: false
+              description: Only contacts with this status
         responses:
             200:
                 description: Return Contact List
         """
-        contact_list = Contact.query.filter_by().order_by(Contact.created_at.desc()).all()
+        contact_query = Contact.query.filter_by()
+        filtered = False
+        if request.args.get("all", "false").lower() not in ("1", "true"):
+            # Bounded on the partition key so PostgreSQL only scans recent partitions.
+            contact_query = contact_query.filter(Contact.created_at >= recent_contacts_since())
+            filtered = True
+        status = request.args.get("status")
+        if status in CONTACT_STATUSES:
+            contact_query = contact_query.filter(Contact.status == status)
+            filtered = True
+        contact_list = contact_query.order_by(Contact.created_at.desc()).all()
         result_contact_list = [Contact.to_dict(contact) for contact in contact_list]
-        return get_response("Contact List", result_contact_list, 200), 200
+        count = get_count("contact", request.args.get("count"), len(result_contact_list) if filtered else None)
+        return get_response("Contact List", result_contact_list, 200, count), 200
     
     def post(self):
         """Contact Create API
@@ -130,17 +171,129 @@ class ContactListCreateResource(Resource):
                 description: Return New Contact ID
             400:
                 description: Full Name, Phone Number, Subject or Message is Blank
+            409:
+                description: The same Phone Number, Subject and Message were already submitted recently
         """
         data = contact_parse.parse_args()
         full_name = data['full_name']
         phone_number = data['phone_number']
         subject = data['subject']
         message = data['message']
+
+        if is_duplicate_contact(phone_number, subject, message):
+            return get_response("This message has already been sent", None, 409), 409
         
         new_contact = Contact(full_name, phone_number, subject, message)
         db.session.add(new_contact)
+        counter_add("contact", 1)
+        counter_add("contact_unread", 1)
         db.session.commit()
+        remember_contact(phone_number, subject, message)
         return get_response("Successfully created contact", new_contact.id, 200), 200
 
+class ContactStatusResource(Resource):
+    decorators = [login_required()]
+
+    def patch(self):
+        """Contact Status Bulk Update API
+        Path - /api/contact/status
+        Method - PATCH
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: body
+              in: body
+              required: true
+              schema:
+                type: object
+                properties:
+                    ids:
+                        type: array
+                        items:
+                            type: integer
+                    status:
+                        type: string
+                        enum: [new, read, handled]
+                required: [ids, status]
+        responses:
+            200:
+                description: Return the number of contacts whose status changed
+            400:
+                description: Ids or Status is Blank or invalid
+        """
+        data = contact_status_parse.parse_args()
+        ids = data['ids']
+        status = data['status']
+
+        # The rows that will change are locked first, so the unread counter moves by exactly
+        # the rows this transaction takes into or out of "new", even when another admin
+        # updates the same contacts concurrently. Then one UPDATE for the whole selection.
+        changing = db.session.query(Contact.id, Contact.status).filter(
+            Contact.id.in_(ids), Contact.status != status
+        ).with_for_update().all()
+        updated = len(changing)
+        if changing:
+            Contact.query.filter(Contact.id.in_([row.id for row in changing])).update(
+                {Contact.status: status}, synchronize_session=False
+            )
+        if status == "new":
+            counter_add("contact_unread", updated)
+        else:
+            counter_add("contact_unread", -sum(1 for row in changing if row.status == "new"))
+
+        db.session.commit()
+        return get_response("Successfully updated contact status", updated, 200), 200
+
+class ContactUnreadCountResource(Resource):
+    decorators = [login_required()]
+
+    def get(self):
+        """Contact Unread Count API
+        Path - /api/contact/unread-count
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+        responses:
+            200:
+                description: Return the number of contacts with status new
+        """
+        return get_response("Contact Unread Count", get_count("contact_unread", "exact"), 200), 200
+
+class ContactDedupStatsResource(Resource):
+    decorators = [login_required()]
+
+    def get(self):
+        """Contact Duplicate Filter Stats API
+        Path - /api/contact/dedup-stats
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+        responses:
+            200:
+                description: Return size, memory use and estimated false-positive rate of this worker's duplicate filter
+        """
+        return get_response("Contact Duplicate Filter Stats", contact_dedup_stats(), 200), 200
+
 api.add_resource(ContactResource, "/<contact_id>")
 api.add_resource(ContactListCreateResource, "/")
+api.add_resource(ContactStatusResource, "/status")
+api.add_resource(ContactUnreadCountResource, "/unread-count")
+api.add_resource(ContactDedupStatsResource, "/dedup-stats")
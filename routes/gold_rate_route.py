@@ -0,0 +1,114 @@
+from models import db
+from flask import Blueprint, request
+from utils.utils import get_response
+from models.gold_rate import GoldRate
+from utils.decorators import login_required
+from utils.cache import cached_response, invalidate
+from utils.pricing import current_rates, invalidate_rates
+from flask_restful import Api, Resource, reqparse
+
+gold_rate_create_parse = reqparse.RequestParser()
+gold_rate_create_parse.add_argument("proba", type=int, required=True, help="Proba cannot be blank")
+gold_rate_create_parse.add_argument("price_per_gramm", type=float, required=True, help="Price Per Gramm cannot be blank")
+gold_rate_create_parse.add_argument("currency", type=str, default="UZS")
+
+gold_rate_bp = Blueprint("gold_rate", __name__, url_prefix="/api/gold-rate")
+api = Api(gold_rate_bp)
+
+class GoldRateListCreateResource(Resource):
+
+    @cached_response("gold_rate")
+    def get(self):
+        """Gold Rate Current API
+        Path - /api/gold-rate
+        Method - GET
+        ---
+        consumes: application/json
+        responses:
+            200:
+                description: Return the current rate for every proba
+        """
+        rates = current_rates()
+        result_rate_list = [
+            {"proba": proba, "price_per_gramm": rate, "currency": currency}
+            for proba, (rate, currency) in sorted(rates.items())
+        ]
+        return get_response("Gold Rate List", result_rate_list, 200), 200
+
+    @login_required()
+    def post(self):
+        """Gold Rate Create API
+        Path - /api/gold-rate
+        Method - POST
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: body
+              in: body
+              required: true
+              schema:
+                type: object
+                properties:
+                    proba:
+                        type: integer
+                    price_per_gramm:
+                        type: number
+                    currency:
+                        type: string
+                required: [proba, price_per_gramm]
+        responses:
+            200:
+                description: Return New Gold Rate ID
+            400:
+                description: Proba or Price Per Gramm is Blank
+        """
+        data = gold_rate_create_parse.parse_args()
+        proba = data['proba']
+        price_per_gramm = data['price_per_gramm']
+        currency = data['currency']
+
+        new_gold_rate = GoldRate(proba, price_per_gramm, currency)
+        db.session.add(new_gold_rate)
+        db.session.commit()
+
+        invalidate_rates()
+        invalidate("product")
+        return get_response("Successfully created gold rate", new_gold_rate.id, 200), 200
+
+class GoldRateHistoryResource(Resource):
+
+    def get(self, proba):
+        """Gold Rate History API
+        Path - /api/gold-rate/history/<proba>
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - name: proba
+              in: path
+              type: integer
+              required: true
+              description: Enter Proba
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Number of most recent rates, default 100
+        responses:
+            200:
+                description: Return Gold Rate History, newest first
+        """
+        limit = min(max(request.args.get("limit", 100, type=int), 1), 1000)
+        gold_rate_list = GoldRate.query.filter_by(proba=proba).order_by(GoldRate.id.desc()).limit(limit).all()
+        result_gold_rate_list = [GoldRate.to_dict(gold_rate) for gold_rate in gold_rate_list]
+        return get_response("Gold Rate History", result_gold_rate_list, 200), 200
+
+api.add_resource(GoldRateListCreateResource, "/")
+api.add_resource(GoldRateHistoryResource, "/history/<int:proba>")
@@ -0,0 +1,64 @@
+import os
+from models import db
+from flask_restful import Api, Resource
+from utils.utils import get_response
+from utils.cache import response_cache
+from flask import Blueprint, current_app
+from utils.translations import translation_catalog
+from utils.warmup import is_warm, warmup_state
+from utils.health import database_check, pool_status
+
+health_bp = Blueprint("health", __name__)
+api = Api(health_bp)
+
+class LivenessResource(Resource):
+
+    def get(self):
+        """Liveness API
+        Path - /healthz
+        Method - GET
+        ---
+        responses:
+            200:
+                description: Process is alive, no database or cache access
+        """
+        return get_response("Alive", {"pid": os.getpid()}, 200), 200
+
+class ReadinessResource(Resource):
+
+    def get(self):
+        """Readiness API
+        Path - /readyz
+        Method - GET
+        ---
+        responses:
+            200:
+                description: Worker is warm and the database answers
+            503:
+                description: Worker is still warming up, warm-up failed or the database is unreachable
+        """
+        engine = db.engine
+        replica_set = current_app.extensions.get("replicas")
+        database = database_check.get(engine)
+        result_data = {
+            "warmup": {
+                "status": warmup_state["status"],
+                "steps": warmup_state["steps"],
+                "error": warmup_state["error"],
+                "attempts": warmup_state["attempts"]
+            },
+            "database": database,
+            "pool": pool_status(engine),
+            "replicas": replica_set.status() if replica_set is not None else [],
+            "cache": {
+                "responses": response_cache.stats(),
+                "translations": translation_catalog.size()
+            }
+        }
+        if not is_warm() or not database["ok"]:
+            return get_response("Not ready", result_data, 503), 503
+
+        return get_response("Ready", result_data, 200), 200
+
+api.add_resource(LivenessResource, "/healthz")
+api.add_resource(ReadinessResource, "/readyz")
@@ -0,0 +1,197 @@
+from models import db
+from flask import Blueprint, request
+from models.job import Job, JOB_STATUSES
+from utils.utils import get_response
+from utils.decorators import login_required
+from utils.jobs import JOB_HANDLERS, enqueue_job, requeue_job
+from flask_restful import Api, Resource, reqparse
+
+job_create_parse = reqparse.RequestParser()
+job_create_parse.add_argument("kind", type=str, required=True, help="Kind cannot be blank")
+job_create_parse.add_argument("payload", type=dict, default={})
+job_create_parse.add_argument("max_attempts", type=int)
+
+job_bp = Blueprint("job", __name__, url_prefix="/api/job")
+api = Api(job_bp)
+
+class JobResource(Resource):
+    decorators = [login_required()]
+
+    def get(self, job_id):
+        """Job Get API
+        Path - /api/job/<job_id>
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: job_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Job ID
+        responses:
+            200:
+                description: Return a Job with its status, attempts, last error and result
+            404:
+                description: Job not found
+        """
+        job = Job.query.filter_by(id=job_id).first()
+        if not job:
+            return get_response("Job not found", None, 404), 404
+
+        return get_response("Job successfully found", Job.to_dict(job), 200), 200
+
+class JobListCreateResource(Resource):
+    decorators = [login_required()]
+
+    def get(self):
+        """Job List API
+        Path - /api/job
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: status
+              in: query
+              type: string
+              enum: [queued, running, succeeded, failed]
+              required: false
+              description: Only jobs with this status
+
+            - name: kind
+              in: query
+              type: string
+              required: false
+              description: Only jobs of this kind
+
+            - name: before_id
+              in: query
+              type: integer
+              required: false
+              description: Return jobs with an id lower than this one (newest first)
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size, at most 500 (default 50)
+        responses:
+            200:
+                description: Return a page of jobs, newest first
+        """
+        limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+        job_query = Job.query
+
+        status = request.args.get("status")
+        if status in JOB_STATUSES:
+            job_query = job_query.filter(Job.status == status)
+        kind = request.args.get("kind")
+        if kind:
+            job_query = job_query.filter(Job.kind == kind)
+        before_id = request.args.get("before_id", type=int)
+        if before_id:
+            job_query = job_query.filter(Job.id < before_id)
+
+        job_list = job_query.order_by(Job.id.desc()).limit(limit).all()
+        result_job_list = [Job.to_dict(job) for job in job_list]
+        return get_response("Job List", result_job_list, 200), 200
+
+    def post(self):
+        """Job Create API
+        Path - /api/job
+        Method - POST
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: body
+              in: body
+              required: true
+              schema:
+                type: object
+                properties:
+                    kind:
+                        type: string
+                        enum: [export_snapshot, image_variants, archive_contacts, reconcile_counters, rebuild_product_stats]
+                    payload:
+                        type: object
+                    max_attempts:
+                        type: integer
+                required: [kind]
+        responses:
+            200:
+                description: Return New Job ID
+            400:
+                description: Kind is Blank or unknown, or the payload does not match the handler
+        """
+        data = job_create_parse.parse_args()
+        kind = data['kind']
+        if kind not in JOB_HANDLERS:
+            return get_response("Unknown job kind", None, 400), 400
+
+        try:
+            new_job = enqueue_job(kind, data['payload'], data['max_attempts'])
+        except ValueError as error:
+            return get_response(str(error), None, 400), 400
+        db.session.commit()
+        return get_response("Successfully queued job", new_job.id, 200), 200
+
+class JobRetryResource(Resource):
+    decorators = [login_required()]
+
+    def post(self, job_id):
+        """Job Retry API
+        Path - /api/job/<job_id>/retry
+        Method - POST
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: job_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Job ID
+        responses:
+            200:
+                description: Failed job queued again with a fresh attempt budget
+            400:
+                description: Job has not failed
+            404:
+                description: Job not found
+        """
+        job = Job.query.filter_by(id=job_id).first()
+        if not job:
+            return get_response("Job not found", None, 404), 404
+        if job.status != "failed":
+            return get_response("Only failed jobs can be retried", None, 400), 400
+
+        requeue_job(job)
+        db.session.commit()
+        return get_response("Successfully queued job again", job.id, 200), 200
+
+api.add_resource(JobResource, "/<job_id>")
+api.add_resource(JobListCreateResource, "/")
+api.add_resource(JobRetryResource, "/<job_id>/retry")
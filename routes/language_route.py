@@ -1,6 +1,9 @@
 from models import db
 from flask import Blueprint
 from utils.utils import get_response
+from utils.cache import cached_response
+from utils.singleflight import single_flight
+from utils.translations import translation_catalog
 from models.language import Language
 from utils.decorators import login_required
 from flask_restful import Api, Resource, reqparse
@@ -81,6 +84,7 @@ class LanguageResource(Resource):
         
         db.session.delete(language)
         db.session.commit()
+        translation_catalog.invalidate()
         return get_response("Successfully deleted language", None, 200), 200
     
     def patch(self, language_id):
@@ -137,6 +141,7 @@ class LanguageResource(Resource):
             found_language.message = message
        
         db.session.commit()
+        translation_catalog.invalidate()
         return get_response("Successfully updated language", None, 200), 200
 
 class LanguageListCreateResource(Resource):
@@ -203,10 +208,13 @@ class LanguageListCreateResource(Resource):
         new_language = Language(lang, code, message)
         db.session.add(new_language)
         db.session.commit()
+        translation_catalog.invalidate()
         return get_response("Successfully created language", new_language.id, 200), 200
 
 class LanguageGetResource(Resource):
     
+    @cached_response("language")
+    @single_flight("language")
     def get(self, lang, code):
         """Language User Get API
         Path - /api/language/user/<lang>/<code>
@@ -231,12 +239,36 @@ class LanguageGetResource(Resource):
             404:
                 description: Language not found
         """
-        language = Language.query.filter_by(lang=lang, code=code).first()
+        language = translation_catalog.get(lang, code)
         if not language:
             return get_response("Language not found", None, 404), 404
         
-        return get_response("Language successfully found", Language.to_dict(language), 200), 200
+        return get_response("Language successfully found", language, 200), 200
+
+class LanguageBundleResource(Resource):
+
+    @cached_response("language")
+    @single_flight("language")
+    def get(self, lang):
+        """Language Bundle API
+        Path - /api/language/bundle/<lang>
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - name: lang
+              in: path
+              type: string
+              required: true
+              description: Enter Language Lang
+        responses:
+            200:
+                description: Return every message of a language keyed by code
+        """
+        result_bundle = translation_catalog.bundle(lang)
+        return get_response("Language Bundle", result_bundle, 200), 200
 
 api.add_resource(LanguageResource, "/<language_id>")
 api.add_resource(LanguageListCreateResource, "/")
 api.add_resource(LanguageGetResource, "/user/<lang>/<code>")
+api.add_resource(LanguageBundleResource, "/bundle/<lang>")
@@ -0,0 +1,23 @@
+from flask import Blueprint, Response
+from flask_restful import Api, Resource
+from utils.metrics import render_metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+api = Api(metrics_bp)
+
+class MetricsResource(Resource):
+
+    def get(self):
+        """Metrics API
+        Path - /metrics
+        Method - GET
+        ---
+        produces: text/plain
+        responses:
+            200:
+                description: Return Prometheus metrics for all workers
+        """
+        data, content_type = render_metrics()
+        return Response(data, mimetype=content_type)
+
+api.add_resource(MetricsResource, "/metrics")
@@ -1,7 +1,22 @@
+import os
 from models import db
-from flask import Blueprint
-from models.product import Product
+from flask import Blueprint, current_app, request, send_from_directory
+from werkzeug.datastructures import FileStorage
+from datetime import datetime
+from models.product import Product, time_zone
+from models.product_translation import ProductTranslation
 from utils.utils import get_response
+from utils.cache import cached_response
+from utils.singleflight import single_flight
+from utils.pricing import apply_prices, current_rates
+from utils.product_stats import product_stats_add, product_stats_summary
+from utils.counters import counter_add, get_count
+from utils.localization import resolve_lang, is_default_lang, localized_query, localize
+from utils.storage import upload_dir, store_stream, file_extension
+from utils.images import IMAGE_EXTENSIONS, IMAGE_VARIANTS, schedule_variants
+from utils.jobs import enqueue_job
+from utils.similar import similar_index
+from utils.read_model import product_read_model, product_sort, raw_response
 from utils.decorators import login_required
 from flask_restful import Api, Resource, reqparse
 
@@ -21,11 +36,22 @@ product_update_parse.add_argument("proba", type=int)
 product_update_parse.add_argument("gramm", type=float)
 product_update_parse.add_argument("type", type=str)
 
+product_translation_parse = reqparse.RequestParser()
+product_translation_parse.add_argument("title", type=str, required=True, help="Title cannot be blank")
+product_translation_parse.add_argument("description", type=str, required=True, help="Description cannot be blank")
+
+product_image_parse = reqparse.RequestParser()
+product_image_parse.add_argument("image", type=FileStorage, location="files", required=True, help="Image cannot be blank")
+
+PRODUCT_IMAGE_URL = "/api/product/image/"
+
 product_bp = Blueprint("product", __name__, url_prefix="/api/product")
 api = Api(product_bp)
 
 class ProductResource(Resource):
     
+    @cached_response("product", localized=True)
+    @single_flight("product", localized=True)
     def get(self, product_id):
         """Product Get API
         Path - /api/product/<product_id>
@@ -38,17 +64,40 @@ class ProductResource(Resource):
               type: integer
               required: true
               description: Enter Product ID
+
+            - name: image_size
+              in: query
+              type: string
+              enum: [thumb, medium, large]
+              required: false
+              description: Return this image variant as image_path when available
+
+            - name: lang
+              in: query
+              type: string
+              required: false
+              description: Content language, overrides the Accept-Language header
         responses:
             200:
                 description: Return a Product
             404:
                 description: Product not found
         """
-        product = Product.query.filter_by(id=product_id).first()
-        if not product:
+        lang = resolve_lang()
+        image_size = request.args.get("image_size")
+        if current_app.config.get("PRODUCT_READ_MODEL"):
+            result_product = product_read_model.detail(product_id, None if is_default_lang(lang) else lang, image_size, current_rates())
+            if result_product is None:
+                return get_response("Product not found", None, 404), 404
+            return raw_response("Product successfully found", result_product, 200)
+
+        row = localized_query(Product, ProductTranslation, ProductTranslation.product_id, lang).filter(Product.id == product_id).first()
+        if not row:
             return get_response("Product not found", None, 404), 404
         
-        return get_response("Product successfully found", Product.to_dict(product), 200), 200
+        product, title, description = row
+        result_product = apply_prices([localize(Product.to_dict(product, image_size), title, description)])[0]
+        return get_response("Product successfully found", result_product, 200), 200
 
     @login_required()
     def delete(self, product_id):
@@ -79,6 +128,8 @@ class ProductResource(Resource):
         if not product:
             return get_response("Product not found", None, 404), 404
         
+        product_stats_add(product.type, product.proba, product.gramm, -1)
+        counter_add("product", -1)
         db.session.delete(product)
         db.session.commit()
         return get_response("Successfully deleted product", None, 200), 200
@@ -139,6 +190,7 @@ class ProductResource(Resource):
         gramm = data.get('gramm', None)
         type = data.get('type', None)
 
+        old_stat_key = (found_product.type, found_product.proba, found_product.gramm)
         if title is not None:
             found_product.title = title
         if description is not None:
@@ -151,25 +203,94 @@ class ProductResource(Resource):
             found_product.gramm = gramm
         if type is not None:
             found_product.type = type
+
+        if (found_product.type, found_product.proba, found_product.gramm) != old_stat_key:
+            product_stats_add(*old_stat_key, -1)
+            product_stats_add(found_product.type, found_product.proba, found_product.gramm, 1)
        
         db.session.commit()
         return get_response("Successfully updated product", None, 200), 200
 
 class ProductListCreateResource(Resource):
 
+    @cached_response("product", localized=True)
+    @single_flight("product", localized=True)
     def get(self):
         """Product List API
         Path - /api/product
         Method - GET
         ---
         consumes: application/json
+        parameters:
+            - name: image_size
+              in: query
+              type: string
+              enum: [thumb, medium, large]
+              required: false
+              description: Return this image variant as image_path when available
+
+            - name: count
+              in: query
+              type: string
+              enum: [exact, estimate]
+              required: false
+              description: Include a total count, estimate uses planner statistics on PostgreSQL
+
+            - name: type
+              in: query
+              type: string
+              required: false
+              description: Only products of this type
+
+            - name: proba
+              in: query
+              type: integer
+              required: false
+              description: Only products of this proba
+
+            - name: sort
+              in: query
+              type: string
+              enum: [created_at, -created_at, gramm, -gramm, proba, -proba]
+              required: false
+              description: Sort field, a leading minus sorts descending (default -created_at)
+
+            - name: lang
+              in: query
+              type: string
+              required: false
+              description: Content language, overrides the Accept-Language header
         responses:
             200:
                 description: Return Product List
         """
-        product_list = Product.query.filter_by().order_by(Product.created_at.desc()).all()
-        result_product_list = [Product.to_dict(product) for product in product_list]
-        return get_response("Product List", result_product_list, 200), 200
+        lang = resolve_lang()
+        image_size = request.args.get("image_size")
+        product_type = request.args.get("type")
+        proba = request.args.get("proba", type=int)
+        sort, descending = product_sort(request.args.get("sort"))
+        filtered = product_type is not None or proba is not None
+        if current_app.config.get("PRODUCT_READ_MODEL"):
+            result_product_list, matched = product_read_model.list(
+                None if is_default_lang(lang) else lang, image_size, current_rates(),
+                product_type, proba, (sort, descending)
+            )
+            count = get_count("product", request.args.get("count"), matched if filtered else None)
+            return raw_response("Product List", result_product_list, 200, count)
+
+        product_query = localized_query(Product, ProductTranslation, ProductTranslation.product_id, lang)
+        if product_type is not None:
+            product_query = product_query.filter(Product.type == product_type)
+        if proba is not None:
+            product_query = product_query.filter(Product.proba == proba)
+        order = (getattr(Product, sort).desc(), Product.id.desc()) if descending else (getattr(Product, sort), Product.id)
+        product_list = product_query.order_by(*order).all()
+        result_product_list = apply_prices([
+            localize(Product.to_dict(product, image_size), title, description)
+            for product, title, description in product_list
+        ])
+        count = get_count("product", request.args.get("count"), len(result_product_list) if filtered else None)
+        return get_response("Product List", result_product_list, 200, count), 200
 
     @login_required()
     def post(self):
@@ -220,8 +341,316 @@ class ProductListCreateResource(Resource):
         
         new_product = Product(title, description, image_path, proba, gramm, type)
         db.session.add(new_product)
+        product_stats_add(type, proba, gramm, 1)
+        counter_add("product", 1)
         db.session.commit()
         return get_response("Successfully created product", new_product.id, 200), 200
 
+class ProductImageResource(Resource):
+
+    @login_required()
+    def post(self, product_id):
+        """Product Image Upload API
+        Path - /api/product/<product_id>/image
+        Method - POST
+        ---
+        consumes: multipart/form-data
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: product_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Product ID
+
+            - name: image
+              in: formData
+              type: file
+              required: true
+              description: JPG, PNG or WEBP image
+        responses:
+            200:
+                description: Return the stored image path, variants are generated in the background
+            400:
+                description: Image is Blank or has an unsupported type
+            404:
+                description: Product not found
+        """
+        found_product = Product.query.filter_by(id=product_id).first()
+        if not found_product:
+            return get_response("Product not found", None, 404), 404
+
+        data = product_image_parse.parse_args()
+        image = data['image']
+        extension = file_extension(image.filename, IMAGE_EXTENSIONS)
+        if extension is None:
+            return get_response("Image type is not supported", None, 400), 400
+
+        directory = upload_dir("products")
+        digest, name, size = store_stream(image.stream, directory, extension)
+
+        found_product.image_path = PRODUCT_IMAGE_URL + name
+        found_product.image_variants = None
+        offload = current_app.config.get("JOB_QUEUE_OFFLOAD", False)
+        if offload:
+            enqueue_job("image_variants", {
+                "product_id": found_product.id,
+                "source_path": os.path.join(directory, name),
+                "output_dir": directory,
+                "digest": digest,
+                "url_prefix": PRODUCT_IMAGE_URL
+            })
+        db.session.commit()
+
+        if not offload:
+            schedule_variants(current_app._get_current_object(), found_product.id, os.path.join(directory, name), directory, digest, PRODUCT_IMAGE_URL)
+        result_data = {
+            "image_path": found_product.image_path,
+            "variants": list(IMAGE_VARIANTS)
+        }
+        return get_response("Successfully uploaded product image", result_data, 200), 200
+
+class ProductImageFileResource(Resource):
+
+    def get(self, filename):
+        """Product Image File API
+        Path - /api/product/image/<filename>
+        Method - GET
+        ---
+        parameters:
+            - name: filename
+              in: path
+              type: string
+              required: true
+              description: Content-addressed image file name
+        responses:
+            200:
+                description: Return the image file
+            404:
+                description: Image not found
+        """
+        # Names are content hashes, so a given URL never changes and can be cached forever.
+        response = send_from_directory(upload_dir("products"), filename, max_age=31536000)
+        response.cache_control.immutable = True
+        response.cache_control.public = True
+        return response
+
+class ProductStatsResource(Resource):
+
+    @cached_response("product")
+    @single_flight("product")
+    def get(self):
+        """Product Stats API
+        Path - /api/product/stats
+        Method - GET
+        ---
+        consumes: application/json
+        responses:
+            200:
+                description: Return product count, total and average gramm overall, per type and per proba
+        """
+        return get_response("Product Stats", product_stats_summary(), 200), 200
+
+class ProductSimilarResource(Resource):
+
+    @cached_response("product", localized=True)
+    @single_flight("product", localized=True)
+    def get(self, product_id):
+        """Product Similar API
+        Path - /api/product/<product_id>/similar
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - name: product_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Product ID
+
+            - name: k
+              in: query
+              type: integer
+              required: false
+              description: Number of similar products, at most 50 (default 8)
+
+            - name: image_size
+              in: query
+              type: string
+              enum: [thumb, medium, large]
+              required: false
+              description: Return this image variant as image_path when available
+
+            - name: lang
+              in: query
+              type: string
+              required: false
+              description: Content language, overrides the Accept-Language header
+        responses:
+            200:
+                description: Return the nearest products by type, proba and gramm, closest first
+            404:
+                description: Product not found
+        """
+        k = min(max(request.args.get("k", 8, type=int), 1), 50)
+        neighbours = similar_index.neighbours(int(product_id), k) if product_id.isdigit() else None
+        if neighbours is None:
+            return get_response("Product not found", None, 404), 404
+
+        lang = resolve_lang()
+        image_size = request.args.get("image_size")
+        distances = dict(neighbours)
+        product_list = localized_query(Product, ProductTranslation, ProductTranslation.product_id, lang).filter(Product.id.in_(list(distances))).all()
+        result_product_list = apply_prices([
+            localize(Product.to_dict(product, image_size), title, description)
+            for product, title, description in product_list
+        ])
+        result_product_list.sort(key=lambda product: distances[product["id"]])
+        return get_response("Similar Product List", result_product_list, 200), 200
+
+class ProductTranslationListResource(Resource):
+
+    def get(self, product_id):
+        """Product Translation List API
+        Path - /api/product/<product_id>/translation
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - name: product_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Product ID
+        responses:
+            200:
+                description: Return every translation of the Product
+        """
+        translation_list = ProductTranslation.query.filter_by(product_id=product_id).order_by(ProductTranslation.lang).all()
+        result_translation_list = [ProductTranslation.to_dict(translation) for translation in translation_list]
+        return get_response("Product Translation List", result_translation_list, 200), 200
+
+class ProductTranslationResource(Resource):
+    decorators = [login_required()]
+
+    def put(self, product_id, lang):
+        """Product Translation Save API
+        Path - /api/product/<product_id>/translation/<lang>
+        Method - PUT
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: product_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Product ID
+
+            - name: lang
+              in: path
+              type: string
+              required: true
+              description: Enter Language Lang
+
+            - name: body
+              in: body
+              required: true
+              schema:
+                type: object
+                properties:
+                    title:
+                        type: string
+                    description:
+                        type: string
+                required: [title, description]
+        responses:
+            200:
+                description: Return the Translation ID
+            400:
+                description: Language is not supported or is the default language
+            404:
+                description: Product not found
+        """
+        found_product = Product.query.filter_by(id=product_id).first()
+        if not found_product:
+            return get_response("Product not found", None, 404), 404
+
+        if lang not in current_app.config["SUPPORTED_LANGUAGES"] or is_default_lang(lang):
+            return get_response("Language is not supported or is the default language", None, 400), 400
+
+        data = product_translation_parse.parse_args()
+        title = data['title']
+        description = data['description']
+
+        found_translation = ProductTranslation.query.filter_by(product_id=found_product.id, lang=lang).first()
+        if found_translation is None:
+            found_translation = ProductTranslation(found_product.id, lang, title, description)
+            db.session.add(found_translation)
+        else:
+            found_translation.title = title
+            found_translation.description = description
+
+        found_product.updated_at = datetime.now(time_zone)
+        db.session.commit()
+        return get_response("Successfully saved product translation", found_translation.id, 200), 200
+
+    def delete(self, product_id, lang):
+        """Product Translation Delete API
+        Path - /api/product/<product_id>/translation/<lang>
+        Method - DELETE
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: product_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Product ID
+
+            - name: lang
+              in: path
+              type: string
+              required: true
+              description: Enter Language Lang
+        responses:
+            200:
+                description: Delete a Translation
+            404:
+                description: Translation not found
+        """
+        translation = ProductTranslation.query.filter_by(product_id=product_id, lang=lang).first()
+        if not translation:
+            return get_response("Translation not found", None, 404), 404
+
+        db.session.delete(translation)
+        found_product = db.session.get(Product, translation.product_id)
+        if found_product is not None:
+            found_product.updated_at = datetime.now(time_zone)
+        db.session.commit()
+        return get_response("Successfully deleted product translation", None, 200), 200
+
 api.add_resource(ProductResource, "/<product_id>")
 api.add_resource(ProductListCreateResource, "/")
+api.add_resource(ProductImageResource, "/<product_id>/image")
+api.add_resource(ProductImageFileResource, "/image/<filename>")
+api.add_resource(ProductStatsResource, "/stats")
+api.add_resource(ProductSimilarResource, "/<product_id>/similar")
+api.add_resource(ProductTranslationListResource, "/<product_id>/translation")
+api.add_resource(ProductTranslationResource, "/<product_id>/translation/<lang>")
@@ -0,0 +1,105 @@
+import time
+import asyncio
+import contextlib
+from sqlalchemy import text
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from utils.replicas import Replica, ReplicaSet, watch_errors
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite"
+}
+
+def async_url(uri):
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError("No async driver configured for %s" % backend)
+    if url.drivername == ASYNC_DRIVERS[backend]:
+        return url
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+class AsyncReplicaSet(ReplicaSet):
+    # The sync ReplicaSet's health bookkeeping, probed through the async engines.
+
+    def __init__(self, replicas, health_interval, retry_interval):
+        super().__init__(replicas, health_interval, retry_interval)
+        self.lock = asyncio.Lock()
+
+    async def _check(self, replica):
+        try:
+            async with replica.engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+            replica.healthy = True
+        except Exception:
+            replica.healthy = False
+        replica.checked_at = time.monotonic()
+        return replica.healthy
+
+    async def pick(self):
+        now = time.monotonic()
+        for replica in self.candidates():
+            if self.due(replica, now):
+                async with self.lock:
+                    if self.due(replica, now):
+                        await self._check(replica)
+            if replica.healthy:
+                return replica
+        return None
+
+class AsyncDatabase:
+    # Read-only session factory for the async app. Reads go to a healthy replica when any
+    # are configured (round-robin), otherwise to the primary.
+
+    def __init__(self, config):
+        uri = config.get("ASYNC_DATABASE_URL") or config["SQLALCHEMY_DATABASE_URI"]
+        self.engine = self._engine(uri, config)
+        self.sessionmaker = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+
+        self.replica_set = None
+        self.replica_sessionmakers = {}
+        uris = [] if config.get("ASYNC_DATABASE_URL") else config.get("SQLALCHEMY_REPLICA_URIS") or []
+        if uris:
+            self.replica_set = AsyncReplicaSet(
+                [Replica("replica-%d" % index, self._engine(replica_uri, config)) for index, replica_uri in enumerate(uris)],
+                config.get("REPLICA_HEALTH_INTERVAL", 10),
+                config.get("REPLICA_RETRY_INTERVAL", 30)
+            )
+            for replica in self.replica_set.replicas:
+                self.replica_sessionmakers[replica.name] = async_sessionmaker(replica.engine, class_=AsyncSession, expire_on_commit=False)
+                watch_errors(self.replica_set, replica)
+
+    @staticmethod
+    def _engine(uri, config):
+        url = async_url(uri)
+        if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+            return create_async_engine(url)
+        return create_async_engine(
+            url,
+            pool_size=config.get("ASYNC_POOL_SIZE", 20),
+            max_overflow=config.get("ASYNC_MAX_OVERFLOW", 20),
+            pool_timeout=config.get("ASYNC_POOL_TIMEOUT", 30),
+            pool_pre_ping=True
+        )
+
+    @contextlib.asynccontextmanager
+    async def session(self):
+        replica = await self.replica_set.pick() if self.replica_set is not None else None
+        sessionmaker = self.replica_sessionmakers[replica.name] if replica is not None else self.sessionmaker
+        async with sessionmaker() as session:
+            try:
+                yield session
+            except (OperationalError, InterfaceError, OSError):
+                # Connection-level failures take the replica out until its retry probe
+                # passes; later requests go to another replica or the primary.
+                if replica is not None:
+                    self.replica_set.mark_down(replica)
+                raise
+
+    async def dispose(self):
+        await self.engine.dispose()
+        for replica in self.replica_set.replicas if self.replica_set is not None else []:
+            await replica.engine.dispose()
+        return None
@@ -0,0 +1,197 @@
+import os
+import queue
+import atexit
+import decimal
+import threading
+from datetime import date, datetime
+from sqlalchemy import event, inspect
+from flask import has_request_context
+from flask_jwt_extended import get_jwt_identity
+from models.product import Product
+from models.product_translation import ProductTranslation
+from models.certificate import Certificate
+from models.certificate_translation import CertificateTranslation
+from models.language import Language
+from models.gold_rate import GoldRate
+from models.audit_log import AuditLog, time_zone
+from utils.replicas import RoutingSession
+from utils.metrics import AUDIT_EVENTS
+
+AUDITED_MODELS = {
+    Product: "product",
+    ProductTranslation: "product_translation",
+    Certificate: "certificate",
+    CertificateTranslation: "certificate_translation",
+    Language: "language",
+    GoldRate: "gold_rate"
+}
+
+_app = None
+_db = None
+_queue = None
+_worker = None
+_worker_pid = None
+_lock = threading.Lock()
+_stop = object()
+
+def _jsonable(value):
+    if value is None or isinstance(value, (str, int, float, bool, list, dict)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return str(value)
+
+def _actor():
+    if not has_request_context():
+        return None
+    try:
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+def _entity_id(state):
+    identity = state.mapper.primary_key_from_instance(state.obj())
+    if all(part is None for part in identity):
+        return None
+    return ",".join(str(part) for part in identity)
+
+def _diff(state, action):
+    changes = {}
+    for column in state.mapper.column_attrs:
+        key = column.key
+        if action == "update":
+            history = state.attrs[key].history
+            if not history.has_changes():
+                continue
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            changes[key] = [_jsonable(old), _jsonable(new)]
+        else:
+            # Inserts record the new row and deletes the last known row; either way one value per field.
+            changes[key] = _jsonable(state.dict.get(key))
+    return changes
+
+def _capture(session, flush_context):
+    records = session.info.setdefault("audit", [])
+    actor = _actor()
+    now = datetime.now(time_zone)
+
+    for action, objects in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            entity = AUDITED_MODELS.get(type(obj))
+            if entity is None:
+                continue
+
+            state = inspect(obj)
+            changes = _diff(state, action)
+            if action == "update" and not changes:
+                continue
+
+            records.append({
+                "actor": actor,
+                "entity": entity,
+                "entity_id": _entity_id(state),
+                "action": action,
+                "changes": changes,
+                "created_at": now
+            })
+    return None
+
+def _enqueue(session):
+    records = session.info.pop("audit", None)
+    if not records:
+        return None
+    if _worker_pid != os.getpid():
+        _start_worker()
+
+    for record in records:
+        try:
+            _queue.put_nowait(record)
+            AUDIT_EVENTS.labels("queued").inc()
+        except queue.Full:
+            # Never block a request on the audit trail; the drop is visible in metrics.
+            AUDIT_EVENTS.labels("dropped").inc()
+    return None
+
+def _discard(session):
+    session.info.pop("audit", None)
+    return None
+
+def _write(batch):
+    app, db = _app, _db
+    try:
+        with app.app_context():
+            with db.engine.begin() as connection:
+                connection.execute(AuditLog.__table__.insert(), batch)
+        AUDIT_EVENTS.labels("written").inc(len(batch))
+    except Exception:
+        AUDIT_EVENTS.labels("failed").inc(len(batch))
+        app.logger.exception("Audit batch of %d records failed", len(batch))
+    return None
+
+def _run(audit_queue):
+    app = _app
+    batch_size = app.config.get("AUDIT_BATCH_SIZE", 100)
+    interval = app.config.get("AUDIT_FLUSH_INTERVAL", 1.0)
+
+    while True:
+        item = audit_queue.get()
+        if item is _stop:
+            return None
+
+        batch = [item]
+        stopping = False
+        while len(batch) < batch_size:
+            try:
+                item = audit_queue.get(timeout=interval)
+            except queue.Empty:
+                break
+            if item is _stop:
+                stopping = True
+                break
+            batch.append(item)
+
+        _write(batch)
+        if stopping:
+            return None
+
+def _start_worker():
+    global _queue, _worker, _worker_pid
+    with _lock:
+        if _worker is not None and _worker_pid == os.getpid():
+            return None
+
+        # Gunicorn forks after the app is imported, so each worker gets its own queue and thread.
+        _queue = queue.Queue(maxsize=_app.config.get("AUDIT_QUEUE_SIZE", 10000))
+        _worker = threading.Thread(target=_run, args=(_queue,), name="audit-writer", daemon=True)
+        _worker_pid = os.getpid()
+        _worker.start()
+    return None
+
+def flush_audit(timeout=5.0):
+    worker, audit_queue = _worker, _queue
+    if worker is None or _worker_pid != os.getpid() or not worker.is_alive():
+        return None
+
+    try:
+        audit_queue.put(_stop, timeout=timeout)
+    except queue.Full:
+        return None
+    worker.join(timeout)
+    return None
+
+def init_audit(app, db):
+    global _app, _db
+    if not app.config.get("AUDIT_ENABLED", True):
+        return None
+
+    _app = app
+    _db = db
+    event.listen(RoutingSession, "after_flush", _capture)
+    event.listen(RoutingSession, "after_commit", _enqueue)
+    event.listen(RoutingSession, "after_rollback", _discard)
+
+    atexit.register(flush_audit)
+    return None
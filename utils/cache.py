@@ -0,0 +1,164 @@
+import time
+import threading
+from collections import OrderedDict
+from flask import Response, current_app, g, request
+from utils.compression import apply_encoding, compress, negotiate_encoding
+from utils.metrics import RESPONSE_CACHE_REQUESTS
+from utils.localization import resolve_lang
+from utils.replicas import PRIMARY_ENVIRON
+
+def cached_response(namespace, localized=False):
+    # Marks a public Resource.get for the response cache. Writes to any endpoint of the
+    # blueprint with the same name invalidate the namespace. Localized handlers are
+    # cached once per resolved language.
+    def decorator(func):
+        func.response_cache_namespace = namespace
+        func.response_cache_localized = localized
+        return func
+    return decorator
+
+def request_key(localized):
+    if localized:
+        return "%s|%s" % (request.full_path, resolve_lang())
+    return request.full_path
+
+class CacheEntry:
+    __slots__ = ("namespace", "body", "mimetype", "expires_at", "variants", "lock")
+
+    def __init__(self, namespace, body, mimetype, expires_at):
+        self.namespace = namespace
+        self.body = body
+        self.mimetype = mimetype
+        self.expires_at = expires_at
+        self.variants = {}
+        self.lock = threading.Lock()
+
+    def variant(self, encoding):
+        # Each encoding is compressed once per entry and then reused for every hit.
+        if encoding is None:
+            return self.body
+
+        data = self.variants.get(encoding)
+        if data is None:
+            with self.lock:
+                data = self.variants.get(encoding)
+                if data is None:
+                    data = compress(self.body, encoding)
+                    self.variants[encoding] = data
+        return data
+
+class ResponseCache:
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.max_entries = 1024
+        self.ttl = 60
+
+    def configure(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, namespace, body, mimetype):
+        entry = CacheEntry(namespace, body, mimetype, time.monotonic() + self.ttl)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, namespace=None):
+        with self.lock:
+            if namespace is None:
+                self.entries.clear()
+                return None
+            for key in [key for key, entry in self.entries.items() if entry.namespace == namespace]:
+                del self.entries[key]
+        return None
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl
+            }
+
+response_cache = ResponseCache()
+
+def invalidate(namespace=None):
+    response_cache.invalidate(namespace)
+    return None
+
+def _cache_handler():
+    if request.method != "GET" or request.endpoint is None:
+        return None
+
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(getattr(view, "view_class", None), "get", None)
+
+def _serve_cached():
+    # Internal primary reads bypass the cache: an entry may hold a lagging replica's rows.
+    if request.environ.get(PRIMARY_ENVIRON):
+        return None
+
+    handler = _cache_handler()
+    namespace = getattr(handler, "response_cache_namespace", None)
+    if namespace is None:
+        return None
+
+    key = request_key(handler.response_cache_localized)
+    entry = response_cache.get(key)
+    if entry is None:
+        RESPONSE_CACHE_REQUESTS.labels(namespace, "miss").inc()
+        g.response_cache_key = (key, namespace)
+        return None
+
+    RESPONSE_CACHE_REQUESTS.labels(namespace, "hit").inc()
+    response = Response(status=200, mimetype=entry.mimetype)
+    encoding = negotiate_encoding(len(entry.body))
+    if encoding is None:
+        response.set_data(entry.body)
+        response.vary.add("Accept-Encoding")
+        g.response_compressed = True
+        return response
+    return apply_encoding(response, entry.variant(encoding), encoding)
+
+def _store_or_invalidate(response):
+    cache_key = g.pop("response_cache_key", None)
+    if cache_key is not None:
+        if response.status_code == 200 and not response.direct_passthrough:
+            key, namespace = cache_key
+            entry = response_cache.set(key, namespace, response.get_data(), response.mimetype)
+            encoding = negotiate_encoding(len(entry.body))
+            if encoding is not None:
+                apply_encoding(response, entry.variant(encoding), encoding)
+        return response
+
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400 and request.blueprint:
+        invalidate(request.blueprint)
+    return response
+
+def init_response_cache(app):
+    if not app.config.get("RESPONSE_CACHE_ENABLED", True):
+        return None
+
+    response_cache.configure(
+        app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024),
+        app.config.get("RESPONSE_CACHE_TTL", 60)
+    )
+    app.before_request(_serve_cached)
+    app.after_request(_store_or_invalidate)
+    return None
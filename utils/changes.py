@@ -0,0 +1,75 @@
+import logging
+from sqlalchemy import event, inspect
+from utils.replicas import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+_listeners = []
+_tables = set()
+
+class Change:
+    __slots__ = ("table", "key", "action", "values")
+
+    def __init__(self, table, key, action, values=None):
+        self.table = table
+        self.key = key
+        self.action = action
+        # Column values as flushed; None when the change came from somewhere else and
+        # listeners have to read the row themselves.
+        self.values = values
+
+def on_change(tables, callback):
+    # callback(changes) runs after a commit that touched any of these tables.
+    _listeners.append((frozenset(tables), callback))
+    _tables.update(tables)
+    return callback
+
+def track(tables):
+    # Captures these tables too, for callers that read session.info["changes"] themselves
+    # before the commit instead of registering a callback.
+    _tables.update(tables)
+    return None
+
+def _key(state):
+    key = state.mapper.primary_key_from_instance(state.obj())
+    return key[0] if len(key) == 1 else tuple(key)
+
+def _capture(session, flush_context):
+    changes = session.info.setdefault("changes", [])
+    for action, objects in (("upsert", session.new), ("upsert", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            table = getattr(obj, "__tablename__", None)
+            if table not in _tables:
+                continue
+
+            state = inspect(obj)
+            values = {column.key: state.dict.get(column.key) for column in state.mapper.column_attrs}
+            changes.append(Change(table, _key(state), action, values))
+    return None
+
+def dispatch_changes(changes):
+    for tables, callback in _listeners:
+        selected = [change for change in changes if change.table in tables]
+        if not selected:
+            continue
+        try:
+            callback(selected)
+        except Exception:
+            logger.exception("Change listener %r failed", callback)
+    return None
+
+def _after_commit(session):
+    changes = session.info.pop("changes", None)
+    if changes:
+        dispatch_changes(changes)
+    return None
+
+def _after_rollback(session):
+    session.info.pop("changes", None)
+    return None
+
+def init_changes(app):
+    event.listen(RoutingSession, "after_flush", _capture)
+    event.listen(RoutingSession, "after_commit", _after_commit)
+    event.listen(RoutingSession, "after_rollback", _after_rollback)
+    return None
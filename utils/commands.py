@@ -0,0 +1,87 @@
+import click
+
+def register_commands(app):
+
+    @app.cli.command("rebuild-product-stats")
+    def rebuild_product_stats_command():
+        """Recompute the product_stat summary from the product table."""
+        from utils.product_stats import product_stats_rebuild
+        click.echo("Rebuilt %d product stat groups" % product_stats_rebuild())
+
+    @app.cli.command("reconcile-counters")
+    def reconcile_counters_command():
+        """Reset the cached table counters from exact COUNT(*) queries."""
+        from utils.counters import counters_reconcile
+        for name, count in counters_reconcile().items():
+            click.echo("%s: %d" % (name, count))
+
+    @app.cli.command("export-snapshot")
+    def export_snapshot_command():
+        """Render the public catalog into SNAPSHOT_DIR, rewriting only changed files."""
+        from utils.snapshot import export_snapshot
+        result = export_snapshot(app)
+        click.echo("Snapshot version %d: %d written, %d removed" % (result["version"], len(result["written"]), len(result["removed"])))
+
+    @app.cli.group("contacts")
+    def contacts_group():
+        """Contact table partitioning and archival."""
+
+    @contacts_group.command("create-partitions")
+    @click.option("--months", default=None, type=int, help="Months ahead to pre-create, default CONTACT_PARTITION_MONTHS_AHEAD")
+    def create_partitions_command(months):
+        """Pre-create monthly contact partitions (PostgreSQL)."""
+        from utils.contact_partitions import create_partitions
+        months = months if months is not None else app.config.get("CONTACT_PARTITION_MONTHS_AHEAD", 3)
+        for name in create_partitions(months):
+            click.echo(name)
+
+    @contacts_group.command("convert")
+    def convert_command():
+        """Migrate an existing plain contact table to a partitioned one (PostgreSQL)."""
+        from utils.contact_partitions import convert_to_partitioned
+        moved = convert_to_partitioned(app.config.get("CONTACT_PARTITION_MONTHS_AHEAD", 3))
+        click.echo("Moved %d contacts into the partitioned table" % moved)
+
+    @contacts_group.command("archive")
+    @click.option("--older-than", default=12, type=int, help="Archive whole months older than this many months")
+    @click.option("--out", "out_dir", default="archive/contacts", help="Directory for contact-YYYY-MM.jsonl.gz files")
+    @click.option("--keep", is_flag=True, help="Export only, keep the rows")
+    def archive_command(older_than, out_dir, keep):
+        """Export old contacts to compressed JSONL and drop their partitions."""
+        from utils.counters import counter_reconcile
+        from utils.contact_partitions import archive
+        for month in archive(older_than, out_dir, drop=not keep):
+            click.echo("%s: %d rows -> %s" % (month["month"], month["rows"], month["path"]))
+        counter_reconcile("contact")
+        counter_reconcile("contact_unread")
+
+    @app.cli.group("jobs")
+    def jobs_group():
+        """Background job queue."""
+
+    @jobs_group.command("worker")
+    @click.option("--processes", default=None, type=int, help="Jobs run in parallel, default JOB_WORKER_PROCESSES")
+    @click.option("--poll-interval", default=None, type=float, help="Seconds between polls when idle, default JOB_POLL_INTERVAL")
+    @click.option("--once", is_flag=True, help="Exit once no job is due instead of polling")
+    def jobs_worker_command(processes, poll_interval, once):
+        """Claim due jobs (FOR UPDATE SKIP LOCKED) and run them in a process pool."""
+        from utils.jobs import run_worker
+        processed = run_worker(app, processes, poll_interval, once, log=click.echo)
+        click.echo("Processed %d jobs" % processed)
+
+    @jobs_group.command("enqueue")
+    @click.argument("kind")
+    @click.option("--payload", default="{}", help="Handler keyword arguments as a JSON object")
+    def jobs_enqueue_command(kind, payload):
+        """Queue a job by kind, e.g. reconcile_counters or export_snapshot."""
+        import json
+        from models import db
+        from utils.jobs import enqueue_job
+        try:
+            job = enqueue_job(kind, json.loads(payload))
+        except ValueError as error:
+            raise click.UsageError(str(error))
+        db.session.commit()
+        click.echo("Queued job %d" % job.id)
+
+    return None
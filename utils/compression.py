@@ -0,0 +1,56 @@
+import gzip
+from flask import current_app, g, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/plain", "text/html", "text/css", "application/javascript")
+
+def available_encodings():
+    if brotli is not None:
+        return ["br", "gzip"]
+    return ["gzip"]
+
+def negotiate_encoding(size):
+    if not current_app.config.get("COMPRESSION_ENABLED", True):
+        return None
+    if size < current_app.config.get("COMPRESSION_MIN_SIZE", 1024):
+        return None
+    return request.accept_encodings.best_match(available_encodings())
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=current_app.config.get("COMPRESSION_BROTLI_QUALITY", 5))
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=current_app.config.get("COMPRESSION_GZIP_LEVEL", 6), mtime=0)
+    return data
+
+def apply_encoding(response, data, encoding):
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    g.response_compressed = True
+    return response
+
+def _compress_response(response):
+    if g.get("response_compressed") or response.direct_passthrough or response.status_code < 200 or response.status_code >= 300:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or "Content-Encoding" in response.headers:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    encoding = negotiate_encoding(len(data))
+    if encoding is None:
+        return response
+
+    return apply_encoding(response, compress(data, encoding), encoding)
+
+def init_compression(app):
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return None
+
+    app.after_request(_compress_response)
+    return None
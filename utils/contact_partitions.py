@@ -0,0 +1,193 @@
+import os
+import gzip
+import json
+import pytz
+from contextlib import nullcontext
+from models import db
+from flask import current_app
+from datetime import datetime
+from models.contact import Contact
+from sqlalchemy import MetaData, PrimaryKeyConstraint, Table, text
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+def is_postgresql():
+    return db.engine.dialect.name == "postgresql"
+
+def month_start(value, offset=0):
+    month = value.year * 12 + value.month - 1 + offset
+    return datetime(month // 12, month % 12 + 1, 1)
+
+def recent_contacts_since():
+    months = current_app.config.get("CONTACT_LIST_RECENT_MONTHS", 3)
+    return month_start(datetime.now(time_zone).replace(tzinfo=None), -(months - 1))
+
+def partition_name(start):
+    return "contact_y%04dm%02d" % (start.year, start.month)
+
+def _partitioned_table():
+    # Same columns and indexes as the model, but PostgreSQL requires the partition key
+    # to be part of the primary key. The ORM keeps using id alone as the identity.
+    source = Contact.__table__
+    columns = []
+    for column in source.columns:
+        copy = column._copy()
+        copy.primary_key = False
+        if copy.name in ("id", "created_at"):
+            copy.nullable = False
+        if copy.name == "id":
+            copy.autoincrement = True
+        columns.append(copy)
+
+    return Table(
+        source.name, MetaData(), *columns,
+        PrimaryKeyConstraint("id", "created_at", name="%s_pkey" % source.name),
+        postgresql_partition_by="RANGE (created_at)"
+    )
+
+def _relkind(connection, name):
+    return connection.execute(text("SELECT relkind FROM pg_class WHERE relname = :name AND relnamespace = 'public'::regnamespace"), {"name": name}).scalar()
+
+def _create_partition(connection, start):
+    end = month_start(start, 1)
+    name = partition_name(start)
+    if _relkind(connection, name) is not None:
+        return name
+
+    bounds = {"start": start, "end": end}
+    create = text(
+        "CREATE TABLE %s PARTITION OF contact FOR VALUES FROM ('%s') TO ('%s')"
+        % (name, start.date().isoformat(), end.date().isoformat())
+    )
+    stray = _relkind(connection, "contact_default") is not None and connection.execute(
+        text("SELECT 1 FROM contact_default WHERE created_at >= :start AND created_at < :end LIMIT 1"), bounds
+    ).scalar()
+    if not stray:
+        connection.execute(create)
+        return name
+
+    # PostgreSQL refuses a partition whose range already has rows in the default one:
+    # detach the default, move those rows into the new month and attach it back.
+    columns = ", ".join(column.name for column in Contact.__table__.columns)
+    connection.execute(text("ALTER TABLE contact DETACH PARTITION contact_default"))
+    connection.execute(create)
+    connection.execute(text(
+        "INSERT INTO contact (%s) SELECT %s FROM contact_default WHERE created_at >= :start AND created_at < :end" % (columns, columns)
+    ), bounds)
+    connection.execute(text("DELETE FROM contact_default WHERE created_at >= :start AND created_at < :end"), bounds)
+    connection.execute(text("ALTER TABLE contact ATTACH PARTITION contact_default DEFAULT"))
+    return name
+
+def create_partitions(months_ahead, first_month=None, connection=None):
+    if not is_postgresql():
+        return []
+
+    now = datetime.now(time_zone).replace(tzinfo=None)
+    start = month_start(first_month or now)
+    last = month_start(now, months_ahead)
+    created = []
+    with db.engine.begin() if connection is None else nullcontext(connection) as conn:
+        while start <= last:
+            created.append(_create_partition(conn, start))
+            start = month_start(start, 1)
+        # Safety net for rows outside every monthly range (clock skew, late imports).
+        conn.execute(text("CREATE TABLE IF NOT EXISTS contact_default PARTITION OF contact DEFAULT"))
+    return created
+
+def _create_partitioned(connection):
+    table = _partitioned_table()
+    table.create(connection)
+    for index in Contact.__table__.indexes:
+        index.create(connection)
+    return None
+
+def ensure_partitioning(app):
+    # Called before create_all: on a fresh PostgreSQL database the contact table is
+    # created partitioned, so create_all then leaves it alone. Later months are added by
+    # the create_contact_partitions job and 'flask contacts create-partitions', not here:
+    # this runs at import in every worker.
+    if not app.config.get("CONTACT_PARTITIONING", True) or not is_postgresql():
+        return None
+
+    with db.engine.begin() as connection:
+        relkind = _relkind(connection, Contact.__tablename__)
+        if relkind is None:
+            _create_partitioned(connection)
+            create_partitions(app.config.get("CONTACT_PARTITION_MONTHS_AHEAD", 3), connection=connection)
+        elif relkind != "p":
+            app.logger.warning("contact is not partitioned, run 'flask contacts convert' to migrate it")
+    return None
+
+def convert_to_partitioned(months_ahead):
+    if not is_postgresql():
+        raise RuntimeError("Partitioning requires PostgreSQL")
+
+    with db.engine.begin() as connection:
+        if _relkind(connection, "contact") == "p":
+            return 0
+
+        connection.execute(text("ALTER TABLE contact RENAME TO contact_legacy"))
+        connection.execute(text("ALTER TABLE contact_legacy RENAME CONSTRAINT contact_pkey TO contact_legacy_pkey"))
+        for index in Contact.__table__.indexes:
+            connection.execute(text("ALTER INDEX IF EXISTS %s RENAME TO %s_legacy" % (index.name, index.name)))
+        _create_partitioned(connection)
+
+        oldest = connection.execute(text("SELECT min(created_at) FROM contact_legacy")).scalar()
+        create_partitions(months_ahead, first_month=oldest, connection=connection)
+
+        columns = ", ".join(column.name for column in Contact.__table__.columns)
+        moved = connection.execute(text("INSERT INTO contact (%s) SELECT %s FROM contact_legacy" % (columns, columns))).rowcount
+        connection.execute(text("SELECT setval(pg_get_serial_sequence('contact', 'id'), COALESCE((SELECT max(id) FROM contact), 0) + 1, false)"))
+        connection.execute(text("DROP TABLE contact_legacy"))
+    return moved
+
+def _export_month(start, end, path):
+    tmp_path = path + ".part"
+    rows = 0
+    query = Contact.query.filter(Contact.created_at >= start, Contact.created_at < end).order_by(Contact.id)
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as file:
+        for contact in query.yield_per(1000):
+            file.write(json.dumps(Contact.to_dict(contact), ensure_ascii=False) + "\n")
+            rows += 1
+    if rows:
+        os.replace(tmp_path, path)
+    else:
+        os.remove(tmp_path)
+    return rows
+
+def archive(older_than_months, out_dir, drop=True):
+    # Exports every whole month older than the cutoff to contact-YYYY-MM.jsonl.gz and
+    # then removes it: on PostgreSQL by detaching and dropping the partition (no row
+    # by row DELETE, no bloat), elsewhere by deleting the rows.
+    os.makedirs(out_dir, exist_ok=True)
+    cutoff = month_start(datetime.now(time_zone).replace(tzinfo=None), -older_than_months)
+    oldest = db.session.query(db.func.min(Contact.created_at)).scalar()
+    archived = []
+    if oldest is None:
+        return archived
+
+    start = month_start(oldest)
+    while start < cutoff:
+        end = month_start(start, 1)
+        path = os.path.join(out_dir, "contact-%04d-%02d.jsonl.gz" % (start.year, start.month))
+        rows = _export_month(start, end, path)
+        db.session.rollback()
+
+        if drop:
+            if is_postgresql():
+                with db.engine.begin() as connection:
+                    name = partition_name(start)
+                    if _relkind(connection, name) is not None:
+                        connection.execute(text("ALTER TABLE contact DETACH PARTITION %s" % name))
+                        connection.execute(text("DROP TABLE %s" % name))
+                    else:
+                        connection.execute(text("DELETE FROM contact WHERE created_at >= :start AND created_at < :end"), {"start": start, "end": end})
+            else:
+                Contact.query.filter(Contact.created_at >= start, Contact.created_at < end).delete(synchronize_session=False)
+                db.session.commit()
+
+        if rows:
+            archived.append({"month": start.strftime("%Y-%m"), "rows": rows, "path": path})
+        start = end
+
+    return archived
@@ -0,0 +1,100 @@
+import pytz
+from models import db
+from datetime import datetime
+from sqlalchemy import func, text
+from models.product import Product
+from models.contact import Contact
+from models.certificate import Certificate
+from models.table_counter import TableCounter
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+COUNTED_MODELS = {
+    "product": Product,
+    "contact": Contact,
+    "certificate": Certificate,
+    "contact_unread": Contact
+}
+
+COUNTED_FILTERS = {
+    "contact_unread": lambda: Contact.status == "new"
+}
+
+COUNT_MODES = ("exact", "estimate")
+
+def _now():
+    return datetime.now(time_zone).replace(tzinfo=None)
+
+def counter_add(name, delta):
+    # Called by create/delete handlers before their commit, so the counter moves in the
+    # same transaction as the row. A missing counter is created unreconciled.
+    counter = TableCounter.query.filter_by(name=name).with_for_update().first()
+    if counter is None:
+        db.session.add(TableCounter(name))
+        return None
+
+    counter.count = counter.count + delta
+    return None
+
+def _exact(name):
+    query = db.session.query(func.count(COUNTED_MODELS[name].id))
+    if name in COUNTED_FILTERS:
+        query = query.filter(COUNTED_FILTERS[name]())
+    return query.scalar()
+
+def counter_reconcile(name):
+    # Runs from the reconcile command and job only. Counting and the locked write both
+    # go to the primary: a replica may lag, and a hot standby refuses FOR UPDATE.
+    db.session.info["wrote"] = True
+    exact = _exact(name)
+
+    counter = TableCounter.query.filter_by(name=name).with_for_update().first()
+    if counter is None:
+        counter = TableCounter(name)
+        db.session.add(counter)
+    counter.count = exact
+    counter.reconciled_at = _now()
+    db.session.commit()
+    return exact
+
+def counters_reconcile():
+    return {name: counter_reconcile(name) for name in COUNTED_MODELS}
+
+def counters_ensure():
+    for name in COUNTED_MODELS:
+        if TableCounter.query.filter_by(name=name).first() is None:
+            counter_reconcile(name)
+    return None
+
+def _estimate(name):
+    if db.session.get_bind().dialect.name != "postgresql" or name in COUNTED_FILTERS:
+        return None
+
+    table = COUNTED_MODELS[name].__tablename__
+    estimate = db.session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"), {"table": table}
+    ).scalar()
+    # reltuples is -1 until the table has been vacuumed or analyzed.
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+def get_count(name, mode, matched=None):
+    if mode not in COUNT_MODES:
+        return None
+
+    # A filtered list is returned whole, so the caller already knows its exact size;
+    # the table counter would count rows the filter excluded.
+    if matched is not None:
+        return matched
+
+    if mode == "estimate":
+        estimate = _estimate(name)
+        if estimate is not None:
+            return estimate
+
+    # Read-only: drift is corrected by the reconcile_counters job, never by a GET.
+    counter = TableCounter.query.filter_by(name=name).first()
+    if counter is None or counter.reconciled_at is None:
+        return _exact(name)
+    return counter.count
@@ -0,0 +1,150 @@
+import math
+import time
+import hashlib
+import threading
+from flask import current_app
+from utils.metrics import CONTACT_DEDUP_CHECKS, CONTACT_DEDUP_MEMORY
+
+class BloomFilter:
+    __slots__ = ("size", "hashes", "bits", "added")
+
+    def __init__(self, size, hashes):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray((size + 7) // 8)
+        self.added = 0
+
+    def positions(self, digest):
+        # Double hashing (Kirsch-Mitzenmacher): k positions from two 64-bit halves of one digest.
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def contains(self, positions):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def add(self, positions):
+        bits = self.bits
+        for p in positions:
+            bits[p >> 3] |= 1 << (p & 7)
+        self.added += 1
+
+    def fill_ratio(self):
+        return int.from_bytes(self.bits, "big").bit_count() / self.size
+
+class RotatingBloomFilter:
+    # Two generations: new digests go into the current filter, lookups check both, and
+    # the previous generation is dropped every `window` seconds or as soon as the current
+    # one holds `capacity` digests. A flood therefore only shortens how long digests are
+    # remembered instead of saturating the bits and rejecting everyone, in fixed memory.
+
+    def __init__(self, capacity, error_rate, window):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.window = window
+        # Each generation is sized for `capacity` entries; a lookup hits either one,
+        # so each gets half the error budget.
+        per_filter = error_rate / 2
+        self.size = max(8, int(math.ceil(-capacity * math.log(per_filter) / (math.log(2) ** 2))))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.current = BloomFilter(self.size, self.hashes)
+        self.previous = BloomFilter(self.size, self.hashes)
+        self.rotated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _rotate(self, now):
+        elapsed = now - self.rotated_at
+        if elapsed < self.window and self.current.added < self.capacity:
+            return None
+
+        if elapsed >= 2 * self.window:
+            self.previous = BloomFilter(self.size, self.hashes)
+        else:
+            self.previous = self.current
+        self.current = BloomFilter(self.size, self.hashes)
+        self.rotated_at = now
+        return None
+
+    def seen(self, digest):
+        with self.lock:
+            self._rotate(time.monotonic())
+            positions = self.current.positions(digest)
+            return self.current.contains(positions) or self.previous.contains(positions)
+
+    def add(self, digest):
+        with self.lock:
+            self._rotate(time.monotonic())
+            positions = self.current.positions(digest)
+            if not self.current.contains(positions):
+                self.current.add(positions)
+        return None
+
+    def memory_bytes(self):
+        return len(self.current.bits) + len(self.previous.bits)
+
+    def stats(self):
+        with self.lock:
+            current_fill = self.current.fill_ratio()
+            previous_fill = self.previous.fill_ratio()
+            current_added = self.current.added
+            previous_added = self.previous.added
+
+        # Expected false-positive rate right now, from the observed bit densities.
+        fpr = 1 - (1 - current_fill ** self.hashes) * (1 - previous_fill ** self.hashes)
+        return {
+            "window_seconds": self.window,
+            "capacity": self.capacity,
+            "target_false_positive_rate": self.error_rate,
+            "estimated_false_positive_rate": round(fpr, 8),
+            "bits_per_filter": self.size,
+            "hash_functions": self.hashes,
+            "memory_bytes": self.memory_bytes(),
+            "current_entries": current_added,
+            "previous_entries": previous_added,
+            "current_fill_ratio": round(current_fill, 6),
+            "previous_fill_ratio": round(previous_fill, 6)
+        }
+
+_filter = None
+_filter_lock = threading.Lock()
+
+def _normalize(value):
+    return " ".join((value or "").split()).casefold()
+
+def contact_digest(phone_number, subject, message):
+    phone = "".join(ch for ch in (phone_number or "") if ch.isdigit())
+    payload = "\x1f".join((phone, _normalize(subject), _normalize(message)))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+def contact_filter():
+    global _filter
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                config = current_app.config
+                _filter = RotatingBloomFilter(
+                    config.get("CONTACT_DEDUP_CAPACITY", 100000),
+                    config.get("CONTACT_DEDUP_ERROR_RATE", 0.001),
+                    config.get("CONTACT_DEDUP_WINDOW", 3600)
+                )
+                CONTACT_DEDUP_MEMORY.set(_filter.memory_bytes())
+    return _filter
+
+def is_duplicate_contact(phone_number, subject, message):
+    if not current_app.config.get("CONTACT_DEDUP_ENABLED", True):
+        return False
+
+    duplicate = contact_filter().seen(contact_digest(phone_number, subject, message))
+    CONTACT_DEDUP_CHECKS.labels("duplicate" if duplicate else "unique").inc()
+    return duplicate
+
+def remember_contact(phone_number, subject, message):
+    # Called after the contact is committed, so a failed insert does not block the retry.
+    if not current_app.config.get("CONTACT_DEDUP_ENABLED", True):
+        return None
+    contact_filter().add(contact_digest(phone_number, subject, message))
+    return None
+
+def contact_dedup_stats():
+    return contact_filter().stats()
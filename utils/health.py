@@ -0,0 +1,47 @@
+import time
+import threading
+from sqlalchemy import text
+from flask import current_app
+
+class DatabaseCheck:
+    # Readiness probes arrive every few seconds from every load balancer; the SELECT 1
+    # result is reused for READINESS_DB_CHECK_TTL seconds so probing stays nearly free.
+
+    def __init__(self):
+        self.result = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def run(self, engine):
+        start = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            return {"ok": True, "ms": round((time.perf_counter() - start) * 1000, 2), "error": None}
+        except Exception as error:
+            return {"ok": False, "ms": round((time.perf_counter() - start) * 1000, 2), "error": str(error)}
+
+    def get(self, engine):
+        ttl = current_app.config.get("READINESS_DB_CHECK_TTL", 5)
+        if self.result is not None and time.monotonic() - self.checked_at < ttl:
+            return self.result
+
+        with self.lock:
+            if self.result is None or time.monotonic() - self.checked_at >= ttl:
+                self.result = self.run(engine)
+                self.checked_at = time.monotonic()
+            return self.result
+
+database_check = DatabaseCheck()
+
+def pool_status(engine):
+    pool = engine.pool
+    if not hasattr(pool, "size"):
+        return {"class": type(pool).__name__}
+
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow()
+    }
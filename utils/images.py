@@ -0,0 +1,75 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+IMAGE_EXTENSIONS = ("jpg", "png", "webp")
+IMAGE_VARIANTS = {
+    "thumb": 200,
+    "medium": 600,
+    "large": 1200
+}
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def generate_variants(source_path, output_dir, digest, quality=80):
+    # Runs in a worker process: keep it free of Flask and database state.
+    from PIL import Image, ImageOps
+
+    variants = {}
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        for name, size in IMAGE_VARIANTS.items():
+            filename = "%s_%s.webp" % (digest, name)
+            path = os.path.join(output_dir, filename)
+            if not os.path.exists(path):
+                variant = image.copy()
+                variant.thumbnail((size, size))
+                tmp_path = path + ".part"
+                variant.save(tmp_path, "WEBP", quality=quality, method=4)
+                os.replace(tmp_path, path)
+            variants[name] = filename
+
+    return variants
+
+def _get_pool(max_workers):
+    # The pool is created per process so gunicorn workers never share one across fork.
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=max_workers)
+            _pool_pid = os.getpid()
+        return _pool
+
+def record_variants(app, product_id, digest, url_prefix, variants):
+    from models import db
+    from models.product import Product
+    from utils.cache import invalidate
+
+    with app.app_context():
+        product = Product.query.filter_by(id=product_id).first()
+        if product is None or not product.image_path.startswith(url_prefix + digest):
+            # Deleted, or a newer image was uploaded while this one was processing.
+            return False
+        product.image_variants = {name: url_prefix + filename for name, filename in variants.items()}
+        db.session.commit()
+    invalidate("product")
+    return True
+
+def schedule_variants(app, product_id, source_path, output_dir, digest, url_prefix):
+    pool = _get_pool(app.config.get("IMAGE_WORKERS", 2))
+    future = pool.submit(generate_variants, source_path, output_dir, digest, app.config.get("IMAGE_WEBP_QUALITY", 80))
+
+    def record(done):
+        if done.exception() is not None:
+            app.logger.error("Image variants failed for product %s: %s", product_id, done.exception())
+            return None
+        record_variants(app, product_id, digest, url_prefix, done.result())
+        return None
+
+    future.add_done_callback(record)
+    return future
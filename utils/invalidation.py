@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import select
+import socket
+import threading
+from sqlalchemy import event, text
+from utils.replicas import RoutingSession
+from utils.changes import Change, dispatch_changes, track
+from utils.cache import invalidate
+from utils.pricing import invalidate_rates
+from utils.translations import translation_catalog
+from utils.metrics import INVALIDATION_EVENTS
+
+# Tables whose writes make another worker's in-process state stale, and the response
+# cache namespaces each one feeds.
+INVALIDATED_TABLES = {
+    "product": ("product",),
+    "product_translation": ("product",),
+    "product_stat": ("product",),
+    "gold_rate": ("gold_rate", "product"),
+    "certificate": ("certificate",),
+    "certificate_translation": ("certificate",),
+    "language": ("language",)
+}
+
+# pg_notify rejects payloads of 8000 bytes or more; past this the keys are dropped
+# and receivers evict whole tables.
+MAX_PAYLOAD = 7000
+
+_app = None
+_db = None
+_listener = None
+_listener_pid = None
+_lock = threading.Lock()
+
+def _capture_bulk(orm_execute_state):
+    # Query.update()/delete() skip the flush and so the change capture in utils.changes;
+    # the whole table is reported.
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+
+    mapper = orm_execute_state.bind_mapper
+    table = mapper.local_table.name if mapper is not None else None
+    if table in INVALIDATED_TABLES:
+        action = "delete" if orm_execute_state.is_delete else "upsert"
+        orm_execute_state.session.info.setdefault("invalidations", []).append([table, None, action])
+    return None
+
+def _origin():
+    return "%s:%d" % (socket.gethostname(), os.getpid())
+
+def _payload(pending):
+    payload = json.dumps({"origin": _origin(), "changes": pending}, separators=(",", ":"))
+    if len(payload) <= MAX_PAYLOAD:
+        return payload
+
+    tables = sorted({table for table, key, action in pending})
+    return json.dumps({"origin": _origin(), "changes": [[table, None, "upsert"] for table in tables]}, separators=(",", ":"))
+
+def _notify(session):
+    # NOTIFY is transactional: PostgreSQL delivers it only if this commit succeeds.
+    # Row changes come from the flush capture in utils.changes, which still dispatches
+    # them locally after the commit.
+    session.flush()
+    pending = [
+        [change.table, change.key, change.action]
+        for change in session.info.get("changes", ())
+        if change.table in INVALIDATED_TABLES
+    ]
+    pending.extend(session.info.pop("invalidations", ()))
+    if not pending:
+        return None
+
+    session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": _app.config.get("INVALIDATION_CHANNEL", "cache_invalidation"), "payload": _payload(pending)},
+        bind_arguments={"bind": _db.engine}
+    )
+    INVALIDATION_EVENTS.labels("sent").inc()
+    return None
+
+def _discard(session):
+    session.info.pop("invalidations", None)
+    return None
+
+def evict(changes):
+    tables = {change.table for change in changes}
+    for namespace in {namespace for table in tables for namespace in INVALIDATED_TABLES.get(table, ())}:
+        invalidate(namespace)
+    if "gold_rate" in tables:
+        invalidate_rates()
+    if "language" in tables:
+        translation_catalog.invalidate()
+    dispatch_changes(changes)
+    return None
+
+def _evict_all():
+    evict([Change(table, None, "upsert") for table in INVALIDATED_TABLES])
+    return None
+
+def _receive(payload):
+    message = json.loads(payload)
+    # This worker already evicted its own writes when it made them.
+    if message.get("origin") == _origin():
+        return None
+
+    changes = [
+        Change(table, tuple(key) if isinstance(key, list) else key, action)
+        for table, key, action in message.get("changes", [])
+    ]
+    with _app.app_context():
+        evict(changes)
+    INVALIDATION_EVENTS.labels("received").inc()
+    return None
+
+def _connect(channel):
+    with _app.app_context():
+        pooled = _db.engine.raw_connection()
+    # A dedicated connection that never goes back to the pool.
+    pooled.detach()
+    connection = pooled.driver_connection
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute('LISTEN "%s"' % channel.replace('"', '""'))
+    return pooled, connection
+
+def _listen():
+    channel = _app.config.get("INVALIDATION_CHANNEL", "cache_invalidation")
+    interval = _app.config.get("INVALIDATION_RECONNECT_INTERVAL", 5)
+
+    while True:
+        pooled = None
+        try:
+            pooled, connection = _connect(channel)
+            # Anything sent while we were not listening is lost.
+            with _app.app_context():
+                _evict_all()
+            INVALIDATION_EVENTS.labels("reconnected").inc()
+
+            while True:
+                if select.select([connection], [], [], 60) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    try:
+                        _receive(notify.payload)
+                    except Exception:
+                        INVALIDATION_EVENTS.labels("failed").inc()
+                        _app.logger.exception("Invalid cache invalidation %r", notify.payload)
+        except Exception:
+            INVALIDATION_EVENTS.labels("failed").inc()
+            _app.logger.exception("Cache invalidation listener failed, reconnecting in %ss", interval)
+        finally:
+            if pooled is not None:
+                try:
+                    pooled.close()
+                except Exception:
+                    pass
+        time.sleep(interval)
+
+def start_listener():
+    global _listener, _listener_pid
+    if _app is None or _listener_pid == os.getpid():
+        return None
+
+    with _lock:
+        if _listener_pid == os.getpid():
+            return None
+
+        # Gunicorn forks after the app is imported, so each worker starts its own listener.
+        _listener = threading.Thread(target=_listen, name="cache-invalidation", daemon=True)
+        _listener_pid = os.getpid()
+        _listener.start()
+    return None
+
+def init_invalidation(app, db):
+    global _app, _db
+    if not app.config.get("INVALIDATION_BUS_ENABLED", True):
+        return None
+
+    with app.app_context():
+        # LISTEN/NOTIFY is PostgreSQL only; elsewhere every cache stays per worker.
+        if db.engine.dialect.name != "postgresql":
+            return None
+
+    _app = app
+    _db = db
+    track(INVALIDATED_TABLES)
+    event.listen(RoutingSession, "do_orm_execute", _capture_bulk)
+    event.listen(RoutingSession, "before_commit", _notify)
+    event.listen(RoutingSession, "after_rollback", _discard)
+    app.before_request(start_listener)
+    return None
@@ -0,0 +1,249 @@
+import os
+import pytz
+import time
+import signal
+import socket
+import random
+import inspect
+import traceback
+import multiprocessing
+from datetime import datetime, timedelta
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from sqlalchemy import and_, or_
+from flask import current_app
+from models import db
+from models.job import Job
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+JOB_HANDLERS = {}
+
+_app = None
+
+def _now():
+    return datetime.now(time_zone).replace(tzinfo=None)
+
+def job_handler(kind):
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+@job_handler("export_snapshot")
+def _export_snapshot(app, scope=None):
+    from utils.snapshot import export_snapshot
+    result = export_snapshot(app, scope)
+    return {"version": result["version"], "written": len(result["written"]), "removed": len(result["removed"])}
+
+@job_handler("image_variants")
+def _image_variants(app, product_id, source_path, output_dir, digest, url_prefix):
+    from utils.images import generate_variants, record_variants
+    variants = generate_variants(source_path, output_dir, digest, app.config.get("IMAGE_WEBP_QUALITY", 80))
+    return {"variants": variants, "recorded": record_variants(app, product_id, digest, url_prefix, variants)}
+
+@job_handler("archive_contacts")
+def _archive_contacts(app, older_than=12, out_dir="archive/contacts", drop=True):
+    from utils.counters import counter_reconcile
+    from utils.contact_partitions import archive
+    with app.app_context():
+        months = archive(older_than, out_dir, drop=drop)
+        counter_reconcile("contact")
+        counter_reconcile("contact_unread")
+    return {"months": months}
+
+@job_handler("create_contact_partitions")
+def _create_contact_partitions(app, months_ahead=None):
+    from utils.contact_partitions import create_partitions
+    with app.app_context():
+        return {"partitions": create_partitions(months_ahead or app.config.get("CONTACT_PARTITION_MONTHS_AHEAD", 3))}
+
+@job_handler("reconcile_counters")
+def _reconcile_counters(app):
+    from utils.counters import counters_reconcile
+    with app.app_context():
+        return counters_reconcile()
+
+@job_handler("rebuild_product_stats")
+def _rebuild_product_stats(app):
+    from utils.product_stats import product_stats_rebuild
+    with app.app_context():
+        return {"groups": product_stats_rebuild()}
+
+def enqueue_job(kind, payload=None, max_attempts=None, delay=0):
+    # Joins the caller's transaction: the job becomes visible when the caller commits.
+    if kind not in JOB_HANDLERS:
+        raise ValueError("Unknown job kind %s" % kind)
+    try:
+        # The payload becomes the handler's keyword arguments; reject it now rather than
+        # after max_attempts failed runs.
+        inspect.signature(JOB_HANDLERS[kind]).bind(None, **(payload or {}))
+    except TypeError as error:
+        raise ValueError("Invalid payload for %s: %s" % (kind, error))
+
+    now = _now()
+    job = Job(
+        kind, payload or {},
+        max_attempts or current_app.config.get("JOB_MAX_ATTEMPTS", 5),
+        now + timedelta(seconds=delay), now
+    )
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+def requeue_job(job):
+    job.status = "queued"
+    job.attempts = 0
+    job.run_at = _now()
+    job.finished_at = None
+    return job
+
+def retry_delay(attempts, config):
+    # Exponential backoff with jitter so a failing batch does not retry in lockstep.
+    base = config.get("JOB_RETRY_BASE", 10)
+    cap = config.get("JOB_RETRY_MAX", 3600)
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.8, 1.2)
+
+def schedule_job(kind, payload=None):
+    # Periodic jobs: queue one unless the same kind is already waiting or running.
+    pending = Job.query.filter(Job.kind == kind, Job.status.in_(("queued", "running"))).first()
+    if pending is not None:
+        return None
+    job = enqueue_job(kind, payload)
+    db.session.commit()
+    return job
+
+def claim_jobs(worker_id, limit, lock_timeout):
+    now = _now()
+    # Running jobs whose worker died are taken over once their lock is older than lock_timeout.
+    due = or_(
+        and_(Job.status == "queued", Job.run_at <= now),
+        and_(Job.status == "running", Job.locked_at < now - timedelta(seconds=lock_timeout))
+    )
+    jobs = (
+        Job.query.filter(due)
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for job in jobs:
+        job.status = "running"
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_at = now
+    db.session.commit()
+    return [(job.id, job.kind, job.payload) for job in jobs]
+
+def finish_job(job_id, worker_id, error=None, result=None):
+    # Only the worker that still holds the lock may record the outcome; a job taken over
+    # after JOB_LOCK_TIMEOUT belongs to its new worker.
+    job = Job.query.filter_by(id=job_id, locked_by=worker_id).with_for_update().first()
+    if job is None:
+        db.session.commit()
+        return "reclaimed"
+
+    now = _now()
+    job.locked_by = None
+    job.locked_at = None
+    if error is None:
+        job.status = "succeeded"
+        job.result = result
+        job.last_error = None
+        job.finished_at = now
+    elif job.attempts >= job.max_attempts:
+        job.status = "failed"
+        job.last_error = error
+        job.finished_at = now
+    else:
+        job.status = "queued"
+        job.last_error = error
+        job.run_at = now + timedelta(seconds=retry_delay(job.attempts, current_app.config))
+    db.session.commit()
+    return job.status
+
+# Children inherit the loaded app (_app) by forking, whatever the platform default is.
+_mp_context = multiprocessing.get_context("fork")
+
+def _init_process():
+    # Forked from the worker command: drop inherited pool connections, they belong to the parent.
+    with _app.app_context():
+        db.engine.dispose(close=False)
+
+def execute_job(kind, payload):
+    try:
+        return JOB_HANDLERS[kind](_app, **payload), None
+    except Exception:
+        return None, traceback.format_exc(limit=20)
+
+def run_worker(app, processes=None, poll_interval=None, once=False, log=print):
+    global _app
+    _app = app
+    processes = processes or app.config.get("JOB_WORKER_PROCESSES", 2)
+    poll_interval = poll_interval or app.config.get("JOB_POLL_INTERVAL", 2)
+    lock_timeout = app.config.get("JOB_LOCK_TIMEOUT", 1800)
+    # Periodic jobs and how often each is queued.
+    periodic = {"reconcile_counters": app.config.get("COUNTER_RECONCILE_INTERVAL", 3600)}
+    if app.config.get("CONTACT_PARTITIONING", True):
+        periodic["create_contact_partitions"] = app.config.get("CONTACT_PARTITION_INTERVAL", 86400)
+    scheduled_at = {}
+    worker_id = "%s:%d" % (socket.gethostname(), os.getpid())
+
+    stopping = []
+    def stop(signum, frame):
+        stopping.append(signum)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    in_flight = {}
+    processed = 0
+    broken = False
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_process, mp_context=_mp_context)
+    try:
+        while True:
+            # Counters are only reconciled here and by the CLI, never inside a request;
+            # partitions are only created here and by the CLI, never at import.
+            for kind, interval in periodic.items():
+                if stopping or once or not interval:
+                    continue
+                if kind not in scheduled_at or time.monotonic() - scheduled_at[kind] >= interval:
+                    with app.app_context():
+                        schedule_job(kind)
+                    scheduled_at[kind] = time.monotonic()
+
+            if not stopping and not broken and len(in_flight) < processes:
+                with app.app_context():
+                    for job_id, kind, payload in claim_jobs(worker_id, processes - len(in_flight), lock_timeout):
+                        log("job %d %s started" % (job_id, kind))
+                        in_flight[pool.submit(execute_job, kind, payload)] = (job_id, kind)
+
+            if not in_flight:
+                if stopping or once:
+                    return processed
+                time.sleep(poll_interval)
+                continue
+
+            done, pending = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                job_id, kind = in_flight.pop(future)
+                try:
+                    result, error = future.result()
+                except BrokenProcessPool:
+                    # A child died (e.g. OOM kill); every job it shared the pool with counts as a failed attempt.
+                    result, error = None, traceback.format_exc(limit=20)
+                    broken = True
+                with app.app_context():
+                    status = finish_job(job_id, worker_id, error, result)
+                processed += 1
+                log("job %d %s %s" % (job_id, kind, status))
+
+            if broken and not in_flight:
+                pool.shutdown(wait=False)
+                pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_process, mp_context=_mp_context)
+                broken = False
+    finally:
+        pool.shutdown(wait=True)
@@ -0,0 +1,64 @@
+from models import db
+from sqlalchemy import and_, null, select
+from flask import current_app, g, request
+from werkzeug.datastructures import LanguageAccept
+from werkzeug.http import parse_accept_header
+
+def negotiate_lang(requested, accept_language, supported, default):
+    if requested in supported:
+        return requested
+    return parse_accept_header(accept_language, LanguageAccept).best_match(supported, default=default)
+
+def resolve_lang():
+    # ?lang= wins over Accept-Language; anything unsupported falls back to the default
+    # language, which is the content stored on the entity itself.
+    lang = g.get("resolved_lang")
+    if lang is not None:
+        return lang
+
+    supported = current_app.config.get("SUPPORTED_LANGUAGES", ["uz"])
+    default = current_app.config.get("DEFAULT_LANGUAGE", supported[0])
+    lang = negotiate_lang(request.args.get("lang"), request.headers.get("Accept-Language"), supported, default)
+
+    g.resolved_lang = lang
+    return lang
+
+def is_default_lang(lang):
+    return lang == current_app.config.get("DEFAULT_LANGUAGE", "uz")
+
+def localized_query(model, translation_model, foreign_key, lang):
+    # One query per page: the requested translation is outer-joined onto each row so
+    # missing translations simply come back as NULL and keep the default content.
+    if is_default_lang(lang):
+        return db.session.query(model, db.null(), db.null())
+
+    return db.session.query(model, translation_model.title, translation_model.description).outerjoin(
+        translation_model, and_(foreign_key == model.id, translation_model.lang == lang)
+    )
+
+def localized_select(model, translation_model, foreign_key, lang, default_lang):
+    # Same shape as localized_query for callers without a Flask session (the async app).
+    if lang == default_lang:
+        return select(model, null(), null())
+
+    return select(model, translation_model.title, translation_model.description).outerjoin(
+        translation_model, and_(foreign_key == model.id, translation_model.lang == lang)
+    )
+
+def localize(result, title, description):
+    if title is not None:
+        result["title"] = title
+    if description is not None:
+        result["description"] = description
+    return result
+
+def _content_language(response):
+    lang = g.get("resolved_lang")
+    if lang is not None:
+        response.vary.add("Accept-Language")
+        response.headers["Content-Language"] = lang
+    return response
+
+def init_localization(app):
+    app.after_request(_content_language)
+    return None
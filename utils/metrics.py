@@ -0,0 +1,126 @@
+import os
+import time
+from sqlalchemy import event
+from flask import g, request
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess, CONTENT_TYPE_LATEST
+from utils.replicas import all_engines
+
+# When PROMETHEUS_MULTIPROC_DIR is set (see gunicorn.conf.py) every worker writes its
+# samples to that directory and the /metrics view merges them at scrape time.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_COUNT = Counter(
+    "http_requests_total", "Total HTTP requests",
+    ["blueprint", "endpoint", "method", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency in seconds",
+    ["blueprint", "endpoint", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter",
+    ["blueprint", "endpoint", "limit"]
+)
+BCRYPT_LATENCY = Histogram(
+    "bcrypt_duration_seconds", "Time spent hashing or checking passwords",
+    ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0, 5.0)
+)
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Response cache lookups",
+    ["namespace", "result"]
+)
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "single_flight_requests_total", "Read handler calls executed or coalesced onto a concurrent identical call",
+    ["namespace", "result"]
+)
+CONTACT_DEDUP_CHECKS = Counter(
+    "contact_dedup_checks_total", "Contact submissions checked against the duplicate filter",
+    ["result"]
+)
+CONTACT_DEDUP_MEMORY = Gauge("contact_dedup_memory_bytes", "Memory held by the contact duplicate filter", multiprocess_mode="livesum")
+AUDIT_EVENTS = Counter(
+    "audit_events_total", "Audit records by stage (queued, dropped, written, failed)",
+    ["result"]
+)
+INVALIDATION_EVENTS = Counter(
+    "cache_invalidation_events_total", "Cross-worker cache invalidations (sent, received, reconnected, failed)",
+    ["result"]
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured connection pool size", ["pool"], multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["pool"], multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections opened beyond the pool size", ["pool"], multiprocess_mode="livesum")
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connection checkouts", ["pool"])
+
+def _labels():
+    blueprint = request.blueprint or "app"
+    endpoint = request.endpoint or "unmatched"
+    return blueprint, endpoint
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+
+def _after_request(response):
+    start = g.pop("metrics_start", None)
+    if start is None:
+        return response
+
+    blueprint, endpoint = _labels()
+    REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - start)
+    REQUEST_COUNT.labels(blueprint, endpoint, request.method, str(response.status_code)).inc()
+    return response
+
+def record_rate_limit_breach(request_limit):
+    blueprint, endpoint = _labels()
+    RATE_LIMIT_REJECTIONS.labels(blueprint, endpoint, str(request_limit.limit)).inc()
+    return None
+
+def bcrypt_timer(operation):
+    return BCRYPT_LATENCY.labels(operation).time()
+
+def _update_pool_stats(pool, name):
+    size = getattr(pool, "size", None)
+    if size is None:
+        return None
+
+    DB_POOL_SIZE.labels(name).set(pool.size())
+    DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+    DB_POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+    return None
+
+def instrument_engine(engine, name):
+    pool = engine.pool
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(name).inc()
+        _update_pool_stats(pool, name)
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        _update_pool_stats(pool, name)
+
+    return None
+
+def init_metrics(app, db):
+    if not app.config.get("METRICS_ENABLED", True):
+        return None
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+    for name, engine in all_engines(app, db):
+        instrument_engine(engine, name)
+
+    return None
+
+def render_metrics():
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
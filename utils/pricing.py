@@ -0,0 +1,102 @@
+import time
+import threading
+import numpy as np
+from models import db
+from sqlalchemy import func, select
+from flask import current_app
+from models.gold_rate import GoldRate
+
+class RateCache:
+    # Current rate per proba, shared by every request in the worker. Loaded with one
+    # query and refreshed when a rate is posted or after GOLD_RATE_CACHE_TTL seconds.
+
+    def __init__(self):
+        self.rates = None
+        self.loaded_at = 0.0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def statement():
+        latest = select(func.max(GoldRate.id)).group_by(GoldRate.proba)
+        return select(GoldRate).where(GoldRate.id.in_(latest))
+
+    def load(self):
+        rows = db.session.scalars(self.statement()).all()
+        return {row.proba: (row.price_per_gramm, row.currency) for row in rows}
+
+    def fresh(self, ttl):
+        rates = self.rates
+        if rates is not None and time.monotonic() - self.loaded_at < ttl:
+            return rates
+        return None
+
+    def store(self, rows):
+        with self.lock:
+            self.rates = {row.proba: (row.price_per_gramm, row.currency) for row in rows}
+            self.loaded_at = time.monotonic()
+            return self.rates
+
+    def get(self):
+        ttl = current_app.config.get("GOLD_RATE_CACHE_TTL", 300)
+        rates = self.fresh(ttl)
+        if rates is not None:
+            return rates
+
+        with self.lock:
+            if self.rates is None or time.monotonic() - self.loaded_at >= ttl:
+                self.rates = self.load()
+                self.loaded_at = time.monotonic()
+            return self.rates
+
+    def invalidate(self):
+        with self.lock:
+            self.rates = None
+        return None
+
+rate_cache = RateCache()
+
+def current_rates():
+    return rate_cache.get()
+
+def invalidate_rates():
+    rate_cache.invalidate()
+    return None
+
+# Below this many products the per-row loop beats numpy's fixed setup cost.
+VECTORIZE_MIN = 64
+
+def _price_arrays(product_dicts, rates):
+    # Looks up every product's rate and computes all prices in numpy; only writing the
+    # results back into the dicts is per row.
+    count = len(product_dicts)
+    known = np.array(sorted(rates), dtype=np.int64)
+    values = np.array([rates[proba][0] for proba in known.tolist()], dtype=np.float64)
+    currencies = [rates[proba][1] for proba in known.tolist()] + [None]
+
+    probas = np.fromiter((product["proba"] for product in product_dicts), dtype=np.int64, count=count)
+    gramms = np.fromiter((product["gramm"] for product in product_dicts), dtype=np.float64, count=count)
+    index = np.searchsorted(known, probas).clip(0, len(known) - 1)
+    priced = known[index] == probas
+    prices = np.round(gramms * values[index], 2)
+    index = np.where(priced, index, len(known))
+
+    for product, price, rate_index, has_rate in zip(product_dicts, prices.tolist(), index.tolist(), priced.tolist()):
+        product["price"] = price if has_rate else None
+        product["currency"] = currencies[rate_index]
+    return product_dicts
+
+def apply_prices(product_dicts, rates=None):
+    # Prices a whole page in one pass against a single rates snapshot, so a page of
+    # products never issues per-row rate queries.
+    if rates is None:
+        rates = current_rates()
+
+    if len(product_dicts) >= VECTORIZE_MIN and rates:
+        return _price_arrays(product_dicts, rates)
+
+    missing = (None, None)
+    for product in product_dicts:
+        rate, currency = rates.get(product["proba"], missing)
+        product["price"] = round(product["gramm"] * rate, 2) if rate is not None else None
+        product["currency"] = currency
+    return product_dicts
@@ -0,0 +1,95 @@
+from models import db
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from models.product import Product
+from models.product_stat import ProductStat
+
+def _upsert_statement(dialect, type, proba, gramm):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+
+    statement = insert(ProductStat).values(type=type, proba=proba, count=1, total_gramm=gramm)
+    return statement.on_conflict_do_update(
+        index_elements=[ProductStat.type, ProductStat.proba],
+        set_={
+            "count": ProductStat.count + statement.excluded.count,
+            "total_gramm": ProductStat.total_gramm + statement.excluded.total_gramm
+        }
+    )
+
+def product_stats_add(type, proba, gramm, sign=1):
+    # Applies one product's contribution to its (type, proba) group inside the caller's
+    # transaction. Adding is a single upsert, so two creates that open a new group do
+    # not both INSERT it; removing locks the row so concurrent writers do not lose updates.
+    if sign > 0:
+        statement = _upsert_statement(db.session.get_bind().dialect.name, type, proba, gramm)
+        if statement is not None:
+            db.session.execute(statement)
+            return None
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(ProductStat(type, proba, 1, gramm))
+            return None
+        except IntegrityError:
+            # Another transaction created the group first; fall through and update it.
+            pass
+
+    stat = ProductStat.query.filter_by(type=type, proba=proba).with_for_update().first()
+    if stat is None:
+        if sign < 0:
+            # The group was never counted (summary out of date); nothing to subtract.
+            return None
+        stat = ProductStat(type, proba)
+        db.session.add(stat)
+
+    stat.count = (stat.count or 0) + sign
+    stat.total_gramm = (stat.total_gramm or 0.0) + sign * gramm
+    if stat.count <= 0:
+        db.session.delete(stat)
+    return None
+
+def product_stats_rebuild():
+    ProductStat.query.delete()
+    rows = db.session.query(
+        Product.type, Product.proba, func.count(Product.id), func.coalesce(func.sum(Product.gramm), 0.0)
+    ).group_by(Product.type, Product.proba).all()
+    db.session.add_all([ProductStat(type, proba, count, total_gramm) for type, proba, count, total_gramm in rows])
+    db.session.commit()
+    return len(rows)
+
+def product_stats_ensure():
+    # Backfills the summary once for databases created before it existed.
+    if ProductStat.query.first() is None and Product.query.first() is not None:
+        return product_stats_rebuild()
+    return 0
+
+def _group(stats, key):
+    groups = {}
+    for stat in stats:
+        group = groups.setdefault(getattr(stat, key), {key: getattr(stat, key), "count": 0, "total_gramm": 0.0})
+        group["count"] += stat.count
+        group["total_gramm"] += stat.total_gramm
+
+    result = []
+    for group in sorted(groups.values(), key=lambda group: group[key]):
+        group["total_gramm"] = round(group["total_gramm"], 3)
+        group["average_gramm"] = round(group["total_gramm"] / group["count"], 3) if group["count"] else None
+        result.append(group)
+    return result
+
+def product_stats_summary():
+    stats = ProductStat.query.all()
+    count = sum(stat.count for stat in stats)
+    total_gramm = sum(stat.total_gramm for stat in stats)
+    return {
+        "count": count,
+        "total_gramm": round(total_gramm, 3),
+        "average_gramm": round(total_gramm / count, 3) if count else None,
+        "by_type": _group(stats, "type"),
+        "by_proba": _group(stats, "proba")
+    }
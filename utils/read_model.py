@@ -0,0 +1,206 @@
+import sys
+import json
+import time
+import threading
+from operator import attrgetter
+from datetime import timedelta
+from flask import current_app
+from models import db
+from models.product import Product
+from models.product_translation import ProductTranslation
+from utils.changes import on_change
+
+PRODUCT_SORTS = ("created_at", "gramm", "proba")
+
+def product_sort(value):
+    # ?sort=gramm / ?sort=-gramm; anything else falls back to newest first.
+    value = value or "-created_at"
+    key = value.lstrip("-")
+    if key not in PRODUCT_SORTS:
+        return "created_at", True
+    return key, value.startswith("-")
+
+def _encode(value):
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+def _member(key, value):
+    return _encode(key) + b":" + _encode(value)
+
+class ProductRecord:
+    # One product, already serialized: `text` holds the id/title/description members and
+    # `image` the image_path member, with `texts` (per language) and `images` (per size)
+    # only allocated for products that have translations or variants. `tail` holds the
+    # remaining fields; price and currency depend on the current rate and are appended
+    # per request.
+    __slots__ = ("id", "type", "proba", "gramm", "created_at", "text", "texts", "image", "images", "tail")
+
+    def __init__(self, product, translations):
+        self.id = product.id
+        self.type = sys.intern(product.type)
+        self.proba = product.proba
+        self.gramm = product.gramm
+        self.created_at = product.created_at
+
+        product_id = _member("id", product.id)
+        self.text = b",".join((product_id, _member("title", product.title), _member("description", product.description)))
+        self.texts = {
+            translation.lang: b",".join((product_id, _member("title", translation.title), _member("description", translation.description)))
+            for translation in translations
+        } or None
+
+        self.image = _member("image_path", product.image_path)
+        self.images = {size: _member("image_path", path) for size, path in (product.image_variants or {}).items()} or None
+
+        self.tail = b",".join((
+            _member("proba", product.proba), _member("gramm", product.gramm),
+            _member("type", product.type), _member("created_at", str(product.created_at))
+        ))
+
+    def render(self, lang, image_size, pricing):
+        text = (self.texts.get(lang) if self.texts and lang else None) or self.text
+        image = (self.images.get(image_size) if self.images and image_size else None) or self.image
+        rate, currency = pricing.get(self.proba, _UNPRICED)
+        price = _encode(round(self.gramm * rate, 2)) if rate is not None else b"null"
+        return b"".join((b"{", text, b",", image, b",", self.tail, b',"price":', price, currency))
+
+_UNPRICED = (None, b',"currency":null}')
+
+def _pricing(rates):
+    # The closing currency member is the same for every product of a proba.
+    return {proba: (rate, b"," + _member("currency", currency) + b"}") for proba, (rate, currency) in rates.items()}
+
+class ProductReadModel:
+    # Per-worker copy of the catalog. Local commits mark rows stale through the change
+    # feed; rows written by other workers are found by polling updated_at every
+    # PRODUCT_READ_MODEL_REFRESH seconds, and deletions by comparing the id set.
+
+    def __init__(self):
+        self.records = None
+        self.orders = {}
+        self.stale_ids = set()
+        self.watermark = None
+        self.checked_at = 0.0
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def _build(self, products):
+        translations = {}
+        if products:
+            for translation in ProductTranslation.query.filter(ProductTranslation.product_id.in_([product.id for product in products])).all():
+                translations.setdefault(translation.product_id, []).append(translation)
+        return {product.id: ProductRecord(product, translations.get(product.id, ())) for product in products}
+
+    def _advance(self, products):
+        for product in products:
+            if product.updated_at is not None and (self.watermark is None or product.updated_at > self.watermark):
+                self.watermark = product.updated_at
+        return None
+
+    def load(self):
+        products = Product.query.all()
+        records = self._build(products)
+        with self.lock:
+            self.records = records
+            self.orders = {}
+            self.stale_ids = set()
+            self.watermark = None
+            self._advance(products)
+            self.loaded_at = self.checked_at = time.monotonic()
+        return len(records)
+
+    def _reload(self, ids):
+        products = Product.query.filter(Product.id.in_(ids)).all() if ids else []
+        records = self._build(products)
+        with self.lock:
+            for product_id in ids:
+                if product_id not in records:
+                    self.records.pop(product_id, None)
+            self.records.update(records)
+            self.orders = {}
+            self._advance(products)
+        return None
+
+    def refresh(self):
+        config = current_app.config
+        now = time.monotonic()
+        ttl = config.get("PRODUCT_READ_MODEL_TTL", 3600)
+        if self.records is None or self.loaded_at is None or (ttl and now - self.loaded_at >= ttl):
+            self.load()
+            return None
+
+        with self.lock:
+            ids = self.stale_ids
+            self.stale_ids = set()
+        if now - self.checked_at >= config.get("PRODUCT_READ_MODEL_REFRESH", 5):
+            self.checked_at = now
+            changed = set()
+            if self.watermark is not None:
+                # Re-read a short overlap: a transaction can commit after a later one's updated_at.
+                since = self.watermark - timedelta(seconds=config.get("PRODUCT_READ_MODEL_OVERLAP", 60))
+                changed = {row.id for row in db.session.query(Product.id).filter(Product.updated_at > since)}
+            ids = ids | changed
+            if changed or db.session.query(db.func.count(Product.id)).scalar() != len(self.records):
+                known = set(self.records)
+                present = {row.id for row in db.session.query(Product.id)}
+                ids = ids | (known - present) | (present - known)
+
+        if ids:
+            self._reload(ids)
+        return None
+
+    def apply(self, changes):
+        with self.lock:
+            for change in changes:
+                if change.table == "product" and change.key is None:
+                    # A bulk write from another worker; reload everything on the next read.
+                    self.loaded_at = None
+                elif change.table == "product":
+                    self.stale_ids.add(change.key)
+                elif change.values and change.values.get("product_id") is not None:
+                    self.stale_ids.add(change.values["product_id"])
+        return None
+
+    def _ordered(self, key, descending):
+        # Sorted views are built once per sort and dropped whenever a row changes.
+        order = self.orders.get((key, descending))
+        if order is None:
+            order = sorted(self.records.values(), key=attrgetter(key, "id"), reverse=descending)
+            self.orders[(key, descending)] = order
+        return order
+
+    def detail(self, product_id, lang, image_size, rates):
+        self.refresh()
+        # product_id comes straight from the URL path.
+        record = self.records.get(int(product_id)) if str(product_id).isdigit() else None
+        if record is None:
+            return None
+        return record.render(lang, image_size, _pricing(rates))
+
+    def list(self, lang, image_size, rates, type=None, proba=None, sort=("created_at", True)):
+        # Returns the encoded list and how many products it holds.
+        self.refresh()
+        with self.lock:
+            order = self._ordered(*sort)
+        pricing = _pricing(rates)
+        items = [
+            record.render(lang, image_size, pricing)
+            for record in order
+            if (type is None or record.type == type) and (proba is None or record.proba == proba)
+        ]
+        return b"[" + b",".join(items) + b"]", len(items)
+
+    def invalidate(self):
+        with self.lock:
+            self.loaded_at = None
+        return None
+
+def raw_response(message, result, status_code, count=None):
+    # get_response() for a result that is already encoded JSON.
+    body = b"".join((
+        b"{", _member("message", message), b',"result":', result, b",", _member("status_code", status_code),
+        (b"," + _member("count", count)) if count is not None else b"", b"}"
+    ))
+    return current_app.response_class(body, status=status_code, mimetype="application/json")
+
+product_read_model = ProductReadModel()
+on_change({"product", "product_translation"}, product_read_model.apply)
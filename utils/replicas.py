@@ -0,0 +1,137 @@
+import time
+import itertools
+import threading
+from sqlalchemy import create_engine, event, text
+from flask import current_app, has_app_context, request
+from flask_sqlalchemy.session import Session
+
+READ_METHODS = ("GET", "HEAD")
+
+# Set in the WSGI environ of internal requests that must read from the primary.
+PRIMARY_ENVIRON = "replicas.primary"
+
+class Replica:
+
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.checked_at = 0.0
+
+class ReplicaSet:
+
+    def __init__(self, replicas, health_interval, retry_interval):
+        self.replicas = replicas
+        self.health_interval = health_interval
+        self.retry_interval = retry_interval
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def _check(self, replica):
+        try:
+            with replica.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            replica.healthy = True
+        except Exception:
+            replica.healthy = False
+        replica.checked_at = time.monotonic()
+        return replica.healthy
+
+    def mark_down(self, replica):
+        replica.healthy = False
+        replica.checked_at = time.monotonic()
+        return None
+
+    def due(self, replica, now):
+        # A healthy replica is re-probed every health_interval, a failed one after retry_interval.
+        interval = self.health_interval if replica.healthy else self.retry_interval
+        return now - replica.checked_at >= interval
+
+    def candidates(self):
+        # Every replica once, starting from the next one in round-robin order.
+        start = next(self.counter)
+        return [self.replicas[(start + offset) % len(self.replicas)] for offset in range(len(self.replicas))]
+
+    def pick(self):
+        # Round-robin over healthy replicas; None means use the primary.
+        now = time.monotonic()
+        for replica in self.candidates():
+            if self.due(replica, now):
+                with self.lock:
+                    if self.due(replica, now):
+                        self._check(replica)
+            if replica.healthy:
+                return replica
+        return None
+
+    def status(self):
+        return [{"name": replica.name, "healthy": replica.healthy} for replica in self.replicas]
+
+class RoutingSession(Session):
+    # Reads from a request marked read-only go to a replica until the session flushes
+    # anything; from then on the request stays on the primary so it sees its own writes.
+    # One replica is picked per request, so its reads all see the same replication lag.
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or self._flushing or not self.info.get("read_only") or self.info.get("wrote"):
+            return engine
+        if not has_app_context() or engine is not self._db.engine:
+            return engine
+
+        replica_set = current_app.extensions.get("replicas")
+        if replica_set is None:
+            return engine
+
+        replica = self.info.get("replica")
+        if replica is None or not replica.healthy:
+            replica = replica_set.pick()
+            if replica is None:
+                return engine
+            self.info["replica"] = replica
+        return replica.engine
+
+@event.listens_for(RoutingSession, "after_flush")
+def _stick_to_primary(session, flush_context):
+    session.info["wrote"] = True
+
+def _mark_request(db):
+    def before_request():
+        db.session.info["read_only"] = request.method in READ_METHODS and not request.environ.get(PRIMARY_ENVIRON)
+        db.session.info.pop("replica", None)
+    return before_request
+
+def watch_errors(replica_set, replica):
+    # An AsyncEngine's events are registered on its sync_engine.
+    @event.listens_for(getattr(replica.engine, "sync_engine", replica.engine), "handle_error")
+    def on_error(context):
+        if context.is_disconnect:
+            replica_set.mark_down(replica)
+    return None
+
+def init_replicas(app, db):
+    uris = app.config.get("SQLALCHEMY_REPLICA_URIS") or []
+    if not uris:
+        return None
+
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    replicas = [Replica("replica-%d" % index, create_engine(uri, **options)) for index, uri in enumerate(uris)]
+    replica_set = ReplicaSet(
+        replicas,
+        app.config.get("REPLICA_HEALTH_INTERVAL", 10),
+        app.config.get("REPLICA_RETRY_INTERVAL", 30)
+    )
+    for replica in replicas:
+        watch_errors(replica_set, replica)
+
+    app.extensions["replicas"] = replica_set
+    app.before_request(_mark_request(db))
+    return replica_set
+
+def all_engines(app, db):
+    with app.app_context():
+        engines = [("primary", db.engine)]
+    replica_set = app.extensions.get("replicas")
+    if replica_set is not None:
+        engines.extend((replica.name, replica.engine) for replica in replica_set.replicas)
+    return engines
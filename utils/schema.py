@@ -0,0 +1,64 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateColumn
+from models import db
+from models.product import Product
+from models.contact import Contact
+
+# Columns added to tables that deployed databases already have. create_all() never alters
+# an existing table, so ensure_schema() adds whatever is missing after it has run.
+ADDED_COLUMNS = [
+    Product.__table__.c.image_variants,
+    Product.__table__.c.updated_at,
+    Contact.__table__.c.status
+]
+
+def _index(table, name):
+    return next(index for index in table.indexes if index.name == name)
+
+# Indexes on those columns, created with checkfirst.
+ADDED_INDEXES = [
+    _index(Product.__table__, "ix_product_updated_at"),
+    _index(Contact.__table__, "ix_contact_unhandled_created_at")
+]
+
+# pg_advisory_xact_lock key shared by every worker running ensure_schema.
+SCHEMA_LOCK = 731031
+
+def _has_column(connection, column):
+    return column.name in {row["name"] for row in inspect(connection).get_columns(column.table.name)}
+
+def _has_index(connection, index):
+    return index.name in {row["name"] for row in inspect(connection).get_indexes(index.table.name)}
+
+def ensure_schema(app):
+    # Runs at import in every worker. On PostgreSQL the first worker takes an advisory
+    # lock and the others wait for it, then find nothing left to do; elsewhere a worker
+    # that loses the race sees the other's column or index and moves on.
+    with db.engine.begin() as connection:
+        postgresql = connection.dialect.name == "postgresql"
+        if postgresql:
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK})
+
+        preparer = connection.dialect.identifier_preparer
+        for column in ADDED_COLUMNS:
+            if _has_column(connection, column):
+                continue
+
+            app.logger.info("Adding column %s.%s", column.table.name, column.name)
+            try:
+                connection.execute(text("ALTER TABLE %s ADD COLUMN %s%s" % (
+                    preparer.format_table(column.table), "IF NOT EXISTS " if postgresql else "",
+                    CreateColumn(column).compile(dialect=connection.dialect)
+                )))
+            except OperationalError:
+                if not _has_column(connection, column):
+                    raise
+
+        for index in ADDED_INDEXES:
+            try:
+                index.create(connection, checkfirst=True)
+            except OperationalError:
+                if not _has_index(connection, index):
+                    raise
+    return None
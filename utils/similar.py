@@ -0,0 +1,135 @@
+import math
+import time
+import threading
+import numpy as np
+from flask import current_app
+from models import db
+from models.product import Product
+from utils.changes import on_change
+
+class SimilarIndex:
+    # One row per product in parallel numpy arrays: type as an integer code, proba and
+    # log(gramm) as floats. A query is a single vectorized distance pass over the rows.
+    # Rows are updated in place on commit; a removed row is swapped with the last one.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.types = np.empty(0, dtype=np.int32)
+        self.probas = np.empty(0, dtype=np.float32)
+        self.gramms = np.empty(0, dtype=np.float32)
+        self.size = 0
+        self.rows = {}
+        self.type_codes = {}
+        self.loaded_at = None
+        return None
+
+    def _type_code(self, type):
+        return self.type_codes.setdefault(type, len(self.type_codes))
+
+    def _grow(self, capacity):
+        if capacity <= len(self.ids):
+            return None
+
+        capacity = max(capacity, 2 * len(self.ids), 64)
+        for name in ("ids", "types", "probas", "gramms"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+        return None
+
+    def _upsert(self, product_id, type, proba, gramm):
+        row = self.rows.get(product_id)
+        if row is None:
+            self._grow(self.size + 1)
+            row = self.size
+            self.size += 1
+            self.rows[product_id] = row
+
+        self.ids[row] = product_id
+        self.types[row] = self._type_code(type)
+        self.probas[row] = proba
+        self.gramms[row] = math.log1p(max(gramm, 0.0))
+        return None
+
+    def _remove(self, product_id):
+        row = self.rows.pop(product_id, None)
+        if row is None:
+            return None
+
+        last = self.size - 1
+        if row != last:
+            for array in (self.ids, self.types, self.probas, self.gramms):
+                array[row] = array[last]
+            self.rows[int(self.ids[row])] = row
+        self.size = last
+        return None
+
+    def load(self):
+        products = db.session.query(Product.id, Product.type, Product.proba, Product.gramm).all()
+        with self.lock:
+            self.reset()
+            self._grow(len(products))
+            for product_id, type, proba, gramm in products:
+                self._upsert(product_id, type, proba, gramm)
+            self.loaded_at = time.monotonic()
+        return self.size
+
+    def apply(self, changes):
+        with self.lock:
+            if self.loaded_at is None:
+                return None
+
+            for change in changes:
+                values = change.values
+                if change.action == "delete" and change.key is not None:
+                    self._remove(change.key)
+                elif values is None or None in (values.get("type"), values.get("proba"), values.get("gramm")):
+                    # Not enough to update in place; rebuild on the next query.
+                    self.loaded_at = None
+                    return None
+                else:
+                    self._upsert(change.key, values["type"], values["proba"], values["gramm"])
+        return None
+
+    def _ensure(self):
+        ttl = current_app.config.get("SIMILAR_INDEX_TTL", 600)
+        loaded_at = self.loaded_at
+        if loaded_at is None or (ttl and time.monotonic() - loaded_at >= ttl):
+            self.load()
+        return None
+
+    def neighbours(self, product_id, k):
+        self._ensure()
+        config = current_app.config
+        with self.lock:
+            row = self.rows.get(product_id)
+            if row is None:
+                return None
+
+            size = self.size
+            types = self.types[:size]
+            # Another type costs more than any proba or weight difference within a type.
+            distances = (types != types[row]).astype(np.float32) * config.get("SIMILAR_TYPE_WEIGHT", 10.0)
+            distances += np.abs(self.probas[:size] - self.probas[row]) * (config.get("SIMILAR_PROBA_WEIGHT", 1.0) / 100.0)
+            distances += np.abs(self.gramms[:size] - self.gramms[row]) * config.get("SIMILAR_GRAMM_WEIGHT", 2.0)
+            distances[row] = np.inf
+
+            k = min(k, size - 1)
+            if k <= 0:
+                return []
+            nearest = np.argpartition(distances, k - 1)[:k]
+            nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+            return [(int(self.ids[i]), float(distances[i])) for i in nearest]
+
+    def invalidate(self):
+        with self.lock:
+            self.loaded_at = None
+        return None
+
+similar_index = SimilarIndex()
+on_change({"product"}, similar_index.apply)
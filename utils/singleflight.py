@@ -0,0 +1,77 @@
+import threading
+from functools import wraps
+from flask import Response, current_app
+from utils.cache import request_key
+from utils.metrics import SINGLE_FLIGHT_REQUESTS
+
+class Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    # Concurrent callers with the same key wait for the first one (the leader) and
+    # share its result instead of repeating the query and serialization.
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, func, timeout=None):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = Call()
+                self.calls[key] = call
+
+        if not leader:
+            if call.event.wait(timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            # The leader is stuck; do not queue behind it forever.
+            return func(), False
+
+        try:
+            call.result = func()
+            return call.result, False
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self.lock:
+                self.calls.pop(key, None)
+            call.event.set()
+
+    def in_flight(self):
+        with self.lock:
+            return len(self.calls)
+
+single_flight_group = SingleFlight()
+
+def _shareable(result):
+    # A Response object is mutated by after_request hooks, so callers share its body instead.
+    if isinstance(result, Response):
+        return Response, result.get_data(), result.status_code, result.mimetype
+    return result
+
+def _unshare(result):
+    if isinstance(result, tuple) and result and result[0] is Response:
+        return current_app.response_class(result[1], status=result[2], mimetype=result[3])
+    return result
+
+def single_flight(namespace, localized=False):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (namespace, request_key(localized))
+            timeout = current_app.config.get("SINGLE_FLIGHT_TIMEOUT", 30)
+            result, coalesced = single_flight_group.do(key, lambda: _shareable(func(*args, **kwargs)), timeout)
+            SINGLE_FLIGHT_REQUESTS.labels(namespace, "coalesced" if coalesced else "executed").inc()
+            return _unshare(result)
+        return wrapper
+    return decorator
@@ -0,0 +1,132 @@
+import json
+import time
+import random
+import logging
+from sqlalchemy import event
+from flask import has_request_context, request
+from logging.handlers import RotatingFileHandler
+from utils.replicas import all_engines
+
+slow_query_logger = logging.getLogger("gold_house.slow_query")
+
+EXPLAIN_PREFIX = {
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN "
+}
+
+def _parameters_shape(parameters):
+    # Only types are logged, never values: contact messages and passwords pass through here.
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return {"executemany": len(parameters), "row": _parameters_shape(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+def _explain(conn, cursor, statement, parameters):
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith("SELECT"):
+        return None
+
+    # A failed statement aborts the surrounding PostgreSQL transaction, so the
+    # EXPLAIN runs inside a savepoint that is rolled back on error.
+    use_savepoint = conn.dialect.name == "postgresql"
+    if use_savepoint and (not conn.in_transaction() or getattr(cursor.connection, "autocommit", False)):
+        # No transaction to set a savepoint in; skip rather than risk the caller's query.
+        return None
+    explain_cursor = cursor.connection.cursor()
+    try:
+        if use_savepoint:
+            explain_cursor.execute("SAVEPOINT slow_query_explain")
+        explain_cursor.execute(prefix + statement, parameters)
+        plan = [" ".join(str(column) for column in row) for row in explain_cursor.fetchall()]
+        if use_savepoint:
+            explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except Exception as error:
+        if use_savepoint:
+            # Also fails when SAVEPOINT itself did; this runs inside after_cursor_execute,
+            # so it must never raise into the query that already succeeded.
+            try:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            except Exception:
+                pass
+        return "EXPLAIN failed: %s" % error
+    finally:
+        explain_cursor.close()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+def _handle_error(context):
+    # after_cursor_execute never runs for a failed statement; drop its start time so it
+    # does not pile up on a pooled connection.
+    connection = context.connection
+    if connection is not None and not connection.closed:
+        starts = connection.info.get("slow_query_start")
+        if starts:
+            starts.pop()
+    return None
+
+def _make_after_cursor_execute(threshold, explain_sample_rate):
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("slow_query_start")
+        if not starts:
+            return None
+
+        duration = time.perf_counter() - starts.pop()
+        if duration < threshold:
+            return None
+
+        record = {
+            "duration_ms": round(duration * 1000, 3),
+            "statement": statement,
+            "parameters": _parameters_shape(parameters),
+            "executemany": executemany,
+            "endpoint": None,
+            "method": None,
+            "path": None,
+            "dialect": conn.dialect.name
+        }
+        if has_request_context():
+            record["endpoint"] = request.endpoint
+            record["method"] = request.method
+            record["path"] = request.path
+
+        if not executemany and explain_sample_rate > 0 and random.random() < explain_sample_rate:
+            record["plan"] = _explain(conn, cursor, statement, parameters)
+
+        slow_query_logger.warning(json.dumps(record, default=str))
+        return None
+
+    return after_cursor_execute
+
+def init_slow_query_log(app, db):
+    if not app.config.get("SLOW_QUERY_LOG_ENABLED", False):
+        return None
+
+    threshold = app.config.get("SLOW_QUERY_THRESHOLD_MS", 200) / 1000
+    explain_sample_rate = app.config.get("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.0)
+    log_path = app.config.get("SLOW_QUERY_LOG_PATH", "slow_queries.log")
+
+    if not slow_query_logger.handlers:
+        handler = RotatingFileHandler(
+            log_path,
+            maxBytes=app.config.get("SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024),
+            backupCount=app.config.get("SLOW_QUERY_LOG_BACKUP_COUNT", 5)
+        )
+        handler.setFormatter(logging.Formatter('{"time": "%(asctime)s", "query": %(message)s}'))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.WARNING)
+        slow_query_logger.propagate = False
+
+    after_cursor_execute = _make_after_cursor_execute(threshold, explain_sample_rate)
+    for name, engine in all_engines(app, db):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    return None
@@ -0,0 +1,190 @@
+import os
+import gzip
+import json
+import fcntl
+import hashlib
+from datetime import datetime
+from flask import request
+from concurrent.futures import ThreadPoolExecutor
+from utils.compression import brotli
+from utils.replicas import PRIMARY_ENVIRON
+
+SNAPSHOT_BLUEPRINTS = ("product", "certificate", "language", "gold_rate")
+MANIFEST = "manifest.json"
+
+_executor = None
+_executor_pid = None
+
+def _atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+    return None
+
+def _remove(root, rel_path):
+    for suffix in ("", ".gz", ".br"):
+        path = os.path.join(root, rel_path + suffix)
+        if os.path.exists(path):
+            os.remove(path)
+    return None
+
+def _load_manifest(root):
+    path = os.path.join(root, MANIFEST)
+    if not os.path.exists(path):
+        return {"version": 0, "files": {}}
+    with open(path) as file:
+        return json.load(file)
+
+def _targets(scope):
+    # scope maps a section to None (everything) or a list of ids; an id whose row
+    # no longer exists has its file removed.
+    from models.product import Product
+    from models.language import Language
+    from models.certificate import Certificate
+
+    targets, removed = {}, []
+    sections = (("product", Product), ("certificate", Certificate))
+    for section, model in sections:
+        if section not in scope:
+            continue
+
+        targets["api/%s/index.json" % section] = "/api/%s/" % section
+        ids = scope[section]
+        if ids is None:
+            ids = [row.id for row in model.query.with_entities(model.id).all()]
+        existing = {row.id for row in model.query.with_entities(model.id).filter(model.id.in_(ids)).all()}
+        for entity_id in ids:
+            rel_path = "api/%s/%s.json" % (section, entity_id)
+            if int(entity_id) in existing:
+                targets[rel_path] = "/api/%s/%s" % (section, entity_id)
+            else:
+                removed.append(rel_path)
+
+    if "language" in scope:
+        langs = [row.lang for row in Language.query.with_entities(Language.lang).distinct().all()]
+        for lang in langs:
+            targets["api/language/bundle/%s.json" % lang] = "/api/language/bundle/%s" % lang
+
+    return targets, removed
+
+def export_snapshot(app, scope=None):
+    if scope is None:
+        scope = {"product": None, "certificate": None, "language": None}
+
+    root = app.config.get("SNAPSHOT_DIR", "snapshot")
+    os.makedirs(root, exist_ok=True)
+    client = app.test_client()
+
+    # Serialize exports across threads and worker processes sharing the directory.
+    with open(os.path.join(root, ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        manifest = _load_manifest(root)
+        with app.app_context():
+            targets, removed = _targets(scope)
+
+        written = []
+        for rel_path, url in targets.items():
+            # Read from the primary: a replica may not have the write this export follows yet.
+            response = client.get(url, headers={"Accept-Encoding": "identity"}, environ_overrides={PRIMARY_ENVIRON: True})
+            if response.status_code != 200:
+                continue
+
+            data = response.get_data()
+            digest = hashlib.sha256(data).hexdigest()
+            if manifest["files"].get(rel_path) == digest and os.path.exists(os.path.join(root, rel_path)):
+                continue
+
+            path = os.path.join(root, rel_path)
+            # Compressed siblings first, so a reader never sees new JSON with stale .gz/.br.
+            _atomic_write(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _atomic_write(path + ".br", brotli.compress(data, quality=11))
+            _atomic_write(path, data)
+            manifest["files"][rel_path] = digest
+            written.append(rel_path)
+
+        # A full export of a section also drops files of rows deleted since the last run.
+        full_sections = [section for section, ids in scope.items() if ids is None]
+        for rel_path in manifest["files"]:
+            if rel_path.split("/")[1] in full_sections and rel_path not in targets:
+                removed.append(rel_path)
+
+        removed = [rel_path for rel_path in set(removed) if rel_path in manifest["files"]]
+        for rel_path in removed:
+            _remove(root, rel_path)
+            del manifest["files"][rel_path]
+
+        if written or removed:
+            manifest["version"] += 1
+            manifest["generated_at"] = datetime.now().isoformat(timespec="seconds")
+            _atomic_write(os.path.join(root, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode())
+
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    return {"version": manifest["version"], "written": written, "removed": removed}
+
+def _write_scope(response):
+    blueprint = request.blueprint
+    view_args = request.view_args or {}
+    if blueprint == "product":
+        product_id = view_args.get("product_id")
+        if product_id is None:
+            # Creates return the new id as their result.
+            result = (response.get_json(silent=True) or {}).get("result")
+            product_id = result if isinstance(result, int) else None
+        return {"product": [product_id] if product_id is not None else []}
+    if blueprint == "gold_rate":
+        # Prices are embedded in every product document.
+        return {"product": None}
+    if blueprint == "certificate":
+        certificate_id = view_args.get("certificate_id")
+        if certificate_id is None:
+            result = (response.get_json(silent=True) or {}).get("result")
+            certificate_id = result if isinstance(result, int) else None
+        return {"certificate": [certificate_id] if certificate_id is not None else []}
+    if blueprint == "language":
+        return {"language": None}
+    return None
+
+def _submit(app, scope):
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=1)
+        _executor_pid = os.getpid()
+
+    def run():
+        try:
+            export_snapshot(app, scope)
+        except Exception:
+            app.logger.exception("Snapshot export failed")
+    return _executor.submit(run)
+
+def init_snapshot(app):
+    if not app.config.get("SNAPSHOT_ON_WRITE", False):
+        return None
+
+    def after_request(response):
+        if request.method in ("GET", "HEAD", "OPTIONS") or response.status_code >= 400:
+            return response
+        if request.blueprint not in SNAPSHOT_BLUEPRINTS:
+            return response
+
+        scope = _write_scope(response)
+        if scope is None:
+            return response
+        if app.config.get("JOB_QUEUE_OFFLOAD", False):
+            from models import db
+            from utils.jobs import enqueue_job
+            enqueue_job("export_snapshot", {"scope": scope})
+            db.session.commit()
+        else:
+            _submit(app, scope)
+        return response
+
+    # Registered after compression and before the response cache: after_request hooks run
+    # in reverse, so this sees the uncompressed body and an already invalidated cache.
+    app.after_request(after_request)
+    return None
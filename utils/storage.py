@@ -0,0 +1,53 @@
+import os
+import re
+import hashlib
+import tempfile
+from flask import current_app
+
+CHUNK_SIZE = 64 * 1024
+
+STORED_NAME = re.compile(r"[0-9a-f]{64}\.([a-z0-9]+)")
+
+def upload_dir(*parts):
+    path = os.path.join(current_app.config.get("UPLOAD_FOLDER", "uploads"), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def store_stream(stream, directory, extension):
+    # Streams to a temporary file in the target directory while hashing, then renames
+    # it to <sha256>.<ext>. Identical uploads map to the same file and the upload is
+    # never held in memory as a whole.
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                file.write(chunk)
+                size += len(chunk)
+
+        name = "%s.%s" % (digest.hexdigest(), extension)
+        os.replace(tmp_path, os.path.join(directory, name))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return digest.hexdigest(), name, size
+
+def file_extension(filename, allowed):
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if extension == "jpeg":
+        extension = "jpg"
+    if extension not in allowed:
+        return None
+    return extension
+
+def is_stored_name(filename, allowed):
+    # Names written by store_stream: <sha256 hex>.<allowed extension>, nothing else.
+    match = STORED_NAME.fullmatch(filename or "")
+    return match is not None and match.group(1) in allowed
@@ -0,0 +1,67 @@
+import os
+import json
+import click
+from flask import current_app, request
+
+SPEC_ENDPOINT = "apispec_1"
+
+def _swagger_class():
+    # flasgger is imported lazily so that a production worker with the UI disabled
+    # never loads it (or the YAML parser behind it).
+    from flasgger import Swagger
+
+    class CachedSwagger(Swagger):
+
+        def get_apispecs(self, endpoint=SPEC_ENDPOINT):
+            # flasgger re-parses every view docstring on each call while the app is in
+            # debug mode. The spec only changes on deploy, so build it once per process.
+            if endpoint not in self.apispecs:
+                spec_file = current_app.config.get("SWAGGER_SPEC_FILE")
+                if spec_file and os.path.exists(spec_file) and endpoint == SPEC_ENDPOINT:
+                    with open(spec_file) as file:
+                        self.apispecs[endpoint] = json.load(file)
+                else:
+                    super().get_apispecs(endpoint)
+
+            return self.apispecs[endpoint]
+
+    return CachedSwagger
+
+def _cache_headers(response):
+    if request.endpoint != "flasgger.%s" % SPEC_ENDPOINT or response.status_code != 200:
+        return response
+
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get("SWAGGER_SPEC_MAX_AGE", 86400)
+    response.add_etag()
+    return response.make_conditional(request)
+
+def export_spec(app, swagger, path):
+    with app.test_request_context():
+        spec = swagger.get_apispecs(SPEC_ENDPOINT)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(spec, file, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+def init_swagger(app, template):
+    if not app.config.get("SWAGGER_ENABLED", True):
+        return None
+
+    swagger = _swagger_class()(app, template=template)
+    app.after_request(_cache_headers)
+
+    @app.cli.command("export-apispec")
+    @click.argument("path", required=False)
+    def export_apispec_command(path):
+        """Write the generated OpenAPI spec to SWAGGER_SPEC_FILE (or PATH)."""
+        path = path or app.config.get("SWAGGER_SPEC_FILE") or "static/apispec.json"
+        click.echo("Spec written to %s" % export_spec(app, swagger, path))
+
+    return swagger
@@ -0,0 +1,70 @@
+import time
+import threading
+from flask import current_app
+from models.language import Language
+
+class TranslationCatalog:
+    # The whole language table is small and read on every page, so each worker holds it
+    # in memory. Any language write drops it and the next lookup reloads it in one query;
+    # TRANSLATION_CATALOG_TTL bounds how long a write from another worker goes unseen
+    # when no invalidation reaches this one.
+
+    def __init__(self):
+        self.entries = None
+        self.loaded_at = 0.0
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def fresh(self, ttl):
+        entries = self.entries
+        if entries is not None and time.monotonic() - self.loaded_at < ttl:
+            return entries
+        return None
+
+    def begin(self):
+        # Taken before querying: fill() keeps its rows only if no invalidate() ran since.
+        with self.lock:
+            return self.generation
+
+    def load(self):
+        generation = self.begin()
+        return self.fill(Language.query.order_by(Language.id).all(), generation)
+
+    def fill(self, languages, generation):
+        entries = {}
+        for language in languages:
+            entries.setdefault((language.lang, language.code), Language.to_dict(language))
+
+        with self.lock:
+            if generation == self.generation:
+                self.entries = entries
+                self.loaded_at = time.monotonic()
+        return entries
+
+    def _entries(self):
+        entries = self.fresh(current_app.config.get("TRANSLATION_CATALOG_TTL", 300))
+        if entries is None:
+            entries = self.load()
+        return entries
+
+    def get(self, lang, code, entries=None):
+        return (entries if entries is not None else self._entries()).get((lang, code))
+
+    def bundle(self, lang, entries=None):
+        entries = entries if entries is not None else self._entries()
+        return {code: entry["message"] for (entry_lang, code), entry in entries.items() if entry_lang == lang}
+
+    def langs(self):
+        return sorted({lang for lang, code in self._entries()})
+
+    def invalidate(self):
+        with self.lock:
+            self.entries = None
+            self.generation += 1
+        return None
+
+    def size(self):
+        entries = self.entries
+        return len(entries) if entries is not None else None
+
+translation_catalog = TranslationCatalog()
@@ -1,9 +1,11 @@
-def get_response(message, result, status_code):
+def get_response(message, result, status_code, count=None):
     _ = {
         "message": message,
         "result": result,
         "status_code": status_code
     }
+    if count is not None:
+        _["count"] = count
     return _
 
 def super_admin_create():
@@ -0,0 +1,103 @@
+import os
+import time
+import threading
+from utils.replicas import all_engines
+from utils.translations import translation_catalog
+
+warmup_state = {
+    "status": "pending",
+    "pid": None,
+    "started_at": None,
+    "finished_at": None,
+    "steps": {},
+    "error": None,
+    "attempts": 0,
+    "retry_at": None
+}
+_lock = threading.Lock()
+
+def _open_pool(app, db):
+    # Connect up to the pool's minimum size now instead of on the first requests.
+    size = app.config.get("WARMUP_POOL_CONNECTIONS", 5)
+    opened = 0
+    for name, engine in all_engines(app, db):
+        connections = []
+        try:
+            for _ in range(min(size, getattr(engine.pool, "size", lambda: size)())):
+                connections.append(engine.connect())
+        finally:
+            for connection in connections:
+                connection.close()
+        opened += len(connections)
+    return opened
+
+def _prime_responses(app):
+    client = app.test_client()
+    primed = {}
+    for path in app.config.get("WARMUP_PATHS", []):
+        primed[path] = client.get(path).status_code
+    return primed
+
+def warm_up(app):
+    from models import db
+
+    steps = warmup_state["steps"]
+    warmup_state.update(status="running", started_at=time.time(), pid=os.getpid(), error=None, retry_at=None)
+    warmup_state["attempts"] += 1
+    try:
+        start = time.perf_counter()
+        steps["db_pool"] = {"connections": _open_pool(app, db)}
+        steps["db_pool"]["ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        start = time.perf_counter()
+        with app.app_context():
+            translation_catalog.load()
+        steps["translations"] = {"entries": translation_catalog.size(), "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+        start = time.perf_counter()
+        steps["responses"] = {"paths": _prime_responses(app), "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+        warmup_state["status"] = "complete"
+    except Exception as error:
+        app.logger.exception("Warm-up failed")
+        # The next request (the readiness probe) starts it again once the backoff is over.
+        delay = min(app.config.get("WARMUP_RETRY_BASE", 1) * 2 ** (warmup_state["attempts"] - 1), app.config.get("WARMUP_RETRY_MAX", 60))
+        warmup_state.update(status="failed", error=str(error), retry_at=time.time() + delay)
+    finally:
+        warmup_state["finished_at"] = time.time()
+    return warmup_state
+
+def _retry_due():
+    return warmup_state["status"] == "failed" and warmup_state["retry_at"] is not None and time.time() >= warmup_state["retry_at"]
+
+def start_warmup(app):
+    # Safe to call repeatedly: runs once per process (gunicorn workers fork), and again
+    # only after a failed attempt's backoff.
+    mode = app.config.get("WARMUP_MODE", "background")
+    with _lock:
+        if warmup_state["pid"] == os.getpid() and not _retry_due():
+            return None
+        if warmup_state["pid"] != os.getpid():
+            warmup_state["attempts"] = 0
+        warmup_state.update(pid=os.getpid(), status="pending", steps={}, retry_at=None)
+
+    if mode == "off":
+        warmup_state["status"] = "complete"
+    elif mode == "sync":
+        warm_up(app)
+    else:
+        threading.Thread(target=warm_up, args=(app,), name="warmup", daemon=True).start()
+    return None
+
+def is_warm():
+    return warmup_state["status"] == "complete" and warmup_state["pid"] == os.getpid()
+
+def init_warmup(app):
+    def before_request():
+        # Fallback for servers without a post-fork hook: the first request (usually a
+        # readiness probe) starts it, and restarts it after a failure.
+        if warmup_state["pid"] != os.getpid() or _retry_due():
+            start_warmup(app)
+
+    app.before_request(before_request)
+    return None